@@ -0,0 +1,116 @@
+"""A BK-tree index for autocorrecting against a large word list.
+
+A BK-tree stores each word under the node of an earlier word, keyed by their
+edit distance. Because edit distance is a metric, a search for the words
+within LIMIT of a typed word that finds a node at distance d only needs to
+visit the children keyed d - LIMIT through d + LIMIT, which skips most of the
+tree for small limits.
+
+    python3 bktree.py [WORD ...]
+"""
+
+from mewtations import distance_from
+from ucb import main
+from utils import lines_from_file
+
+
+class BKTree:
+    """A BK-tree over WORDS that autocorrects as autocorrect does with
+    minimum_mewtations as its diff function.
+
+    >>> tree = BKTree(['cats', 'scat', 'cast', 'kittens', 'cat'])
+    >>> len(tree)
+    5
+    >>> tree.search('cst', 1)
+    [(1, 2, 'cast'), (1, 4, 'cat')]
+    >>> tree.autocorrect('cst', 1), tree.autocorrect('ckiteus', 3), tree.autocorrect('ckiteus', 2)
+    ('cast', 'kittens', 'ckiteus')
+    """
+
+    def __init__(self, words: list[str]):
+        # Node i holds words[indices[i]], the first occurrence of that word,
+        # and children[i] maps edit distances to the nodes below it.
+        self.words: list[str] = []
+        self.indices: list[int] = []
+        self.children: list[dict[int, int]] = []
+        self.first: dict[str, int] = {}
+        for index, word in enumerate(words):
+            if word not in self.first:
+                self.first[word] = index
+                self.add(word, index)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def add(self, word: str, index: int) -> None:
+        """Add WORD, found at INDEX of the word list, to the tree."""
+        node = len(self.words)
+        self.words.append(word)
+        self.indices.append(index)
+        self.children.append({})
+        if node == 0:
+            return
+        distance_to = distance_from(word)
+        parent = 0
+        while True:
+            distance = distance_to(self.words[parent])
+            child = self.children[parent].get(distance)
+            if child is None:
+                self.children[parent][distance] = node
+                return
+            parent = child
+
+    def search(self, typed_word: str, limit: int) -> list[tuple[int, int, str]]:
+        """Return (distance, index, word) for each word within LIMIT edits of
+        TYPED_WORD, in order of distance and then index."""
+        found = []
+        if not self.words or limit < 0:
+            return found
+        distance_to = distance_from(typed_word)
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            distance = distance_to(self.words[node])
+            if distance <= limit:
+                found.append((distance, self.indices[node], self.words[node]))
+            for key, child in self.children[node].items():
+                if distance - limit <= key <= distance + limit:
+                    stack.append(child)
+        return sorted(found)
+
+    def autocorrect(self, typed_word: str, limit: int) -> str:
+        """Return the word closest to TYPED_WORD, the earliest in the word list
+        among ties, or TYPED_WORD if it is in the word list or no word is
+        within LIMIT edits.
+
+        Most typos are one edit away, so the tree is searched with a radius of
+        one edit before larger radii, which visit many more of its nodes.
+        """
+        if typed_word in self.first:
+            return typed_word
+        for radius in range(1, limit + 1):
+            found = self.search(typed_word, radius)
+            if found:
+                return found[0][2]
+        return typed_word
+
+
+@main
+def run(*args):
+    """Autocorrect words against data/words.txt with a BK-tree."""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Autocorrect with a BK-tree')
+    parser.add_argument('words', nargs='*', help='Words to autocorrect')
+    parser.add_argument('--limit', type=int, default=2, help='Largest number of edits')
+    parser.add_argument('--words-file', default='data/words.txt', help='Word list to correct against')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tree = BKTree(lines_from_file(args.words_file))
+    print(f'Built a BK-tree of {len(tree)} words in {time.perf_counter() - start:.1f}s')
+    for word in args.words:
+        start = time.perf_counter()
+        correction = tree.autocorrect(word, args.limit)
+        print(f'{word} -> {correction} ({(time.perf_counter() - start) * 1000:.2f}ms)')
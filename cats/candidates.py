@@ -0,0 +1,66 @@
+"""An index of words by their sets of letters, for choosing autocorrect
+candidates.
+
+The GUI only scores the words whose letters are similar to those of the
+typed word: at most LIMIT letters of either set are missing from the other.
+Rather than intersect the typed letters with the letters of every word, the
+index groups words by the bitmask of their letters, and looks up only the
+masks that can be similar to the typed letters: those formed by dropping up
+to LIMIT of its letters and adding up to LIMIT others.
+"""
+
+from itertools import combinations
+
+
+class LetterIndex:
+    """An index of WORDS by the set of letters in each.
+
+    >>> index = LetterIndex(['cat', 'act', 'tack', 'dog', 'cast', 'at'])
+    >>> index.similar('cta', 0)
+    ['cat', 'act']
+    >>> index.similar('cta', 1)
+    ['cat', 'act', 'tack', 'cast', 'at']
+    >>> index.similar('cxta', 1)
+    ['cat', 'act', 'tack', 'cast']
+    """
+
+    def __init__(self, words: list[str]):
+        self.words = words
+        self.bits: dict[str, int] = {}
+        self.groups: dict[int, list[int]] = {}
+        for i, word in enumerate(words):
+            self.groups.setdefault(self.mask(word, add=True), []).append(i)
+
+    def mask(self, word: str, add: bool = False) -> int:
+        """Return the bitmask of the letters of WORD, with a bit for each
+        letter in the index (and for each new one, if ADD)."""
+        mask = 0
+        for letter in set(word):
+            if add and letter not in self.bits:
+                self.bits[letter] = 1 << len(self.bits)
+            mask |= self.bits.get(letter, 0)
+        return mask
+
+    def similar(self, word: str, limit: int) -> list[str]:
+        """Return the words whose sets of letters, s, are similar to the set of
+        letters of WORD, t, as the GUI's similar(s, t, LIMIT) decides, in the
+        order of the word list."""
+        letters = set(word)
+        typed = self.mask(word)
+        # Letters of WORD that no word has must be among those dropped.
+        unknown = sum(letter not in self.bits for letter in letters)
+        if unknown > limit:
+            return []
+        present = [bit for bit in self.bits.values() if bit & typed]
+        absent = [bit for bit in self.bits.values() if not bit & typed]
+        removals = [sum(dropped) for k in range(limit - unknown + 1) for dropped in combinations(present, k)]
+        additions = [sum(added) for k in range(limit + 1) for added in combinations(absent, k)]
+        found = []
+        for removed in removals:
+            kept = typed & ~removed
+            for added in additions:
+                group = self.groups.get(kept | added)
+                if group:
+                    found.extend(group)
+        found.sort()
+        return [self.words[i] for i in found]
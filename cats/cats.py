@@ -1,6 +1,7 @@
 """Typing test implementation"""
 
 import random
+from collections import OrderedDict, namedtuple
 from collections.abc import Callable
 from datetime import datetime
 from itertools import pairwise
@@ -10,6 +11,7 @@ from ucb import interact, main, trace
 from utils import (
     count,
     deep_convert_to_tuple,
+    fingerprint,
     lines_from_file,
     lower,
     remove_punctuation,
@@ -143,6 +145,62 @@ def memo(f: Callable[..., Any]) -> Callable[..., Any]:
     return memoized
 
 
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def lru_memo(maxsize: int = 4096) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """A memoization decorator that keeps the MAXSIZE most recently used
+    results. List and tuple arguments are keyed by their fingerprint, so a
+    long word list is not copied and hashed on every call, and a result is
+    only reused for arguments with the same contents.
+
+    >>> @lru_memo(maxsize=2)
+    ... def longest(words):
+    ...     return max(words, key=len)
+    >>> words = ['cat', 'kitten', 'tabby']
+    >>> longest(words), longest(words), longest(['cat']), longest(['dog'])
+    ('kitten', 'kitten', 'cat', 'dog')
+    >>> longest.cache_info()
+    CacheInfo(hits=1, misses=3, maxsize=2, currsize=2)
+    >>> longest(words), longest.cache_info().misses
+    ('kitten', 4)
+    >>> longest([[-1]]), longest([[-2]])
+    ([-1], [-2])
+    """
+
+    def decorator(f: Callable[..., Any]) -> Callable[..., Any]:
+        cache: OrderedDict[tuple[Any, ...], Any] = OrderedDict()
+        hits = misses = 0
+
+        def memoized(*args: Any) -> Any:
+            nonlocal hits, misses
+            key = tuple(fingerprint(arg) if isinstance(arg, (list, tuple)) else arg for arg in args)
+            if key in cache:
+                hits += 1
+                cache.move_to_end(key)
+                return cache[key]
+            misses += 1
+            result = f(*args)
+            cache[key] = result
+            if len(cache) > maxsize:
+                cache.popitem(last=False)
+            return result
+
+        def cache_info() -> CacheInfo:
+            return CacheInfo(hits, misses, maxsize, len(cache))
+
+        def cache_clear() -> None:
+            nonlocal hits, misses
+            cache.clear()
+            hits = misses = 0
+
+        memoized.cache_info = cache_info  # type: ignore
+        memoized.cache_clear = cache_clear  # type: ignore
+        return memoized
+
+    return decorator
+
+
 def memo_diff(diff_function: Callable[[str, str, int], int]) -> Callable[[str, str, int], int]:
     """A memoization function."""
     cache: dict[tuple[str, str, int], int] = {}
@@ -166,7 +224,7 @@ def memo_diff(diff_function: Callable[[str, str, int], int]) -> Callable[[str, s
 ###########
 
 
-@memo
+@lru_memo()
 def autocorrect(
     typed_word: str,
     word_list: list[str],
@@ -4,17 +4,20 @@ import os
 import random
 import string
 
-import cats
+import mewtations
+from candidates import LetterIndex
 from gui_files.common_server import Server, route, sendto, start
 from multiplayer import multiplayer
 
+import cats
+
 PORT = 31415
 DEFAULT_SERVER = "https://cats.cs61a.org"
 GUI_FOLDER = "gui_files/"
 PARAGRAPH_PATH = "./data/sample_paragraphs.txt"
 WORDS_LIST = cats.lines_from_file("data/words.txt")
 WORDS_SET = set(WORDS_LIST)
-LETTER_SETS = [(w, set(w)) for w in WORDS_LIST]
+LETTER_INDEX = LetterIndex(WORDS_LIST)
 SIMILARITY_LIMIT = 2
 
 
@@ -51,13 +54,17 @@ def autocorrect(word=""):
         return raw_word
 
     # Heuristically choose candidate words to score.
-    letters = set(word)
-    candidates = [w for w, s in LETTER_SETS if similar(s, letters, SIMILARITY_LIMIT)]
+    # The same words as [w for w in WORDS_LIST if similar(set(w), set(word), SIMILARITY_LIMIT)].
+    candidates = LETTER_INDEX.similar(word, SIMILARITY_LIMIT)
 
     # Try various diff functions until one doesn't raise an exception.
     for fn in [cats.final_diff, cats.minimum_mewtations, cats.furry_fixes]:
         try:
-            guess = cats.autocorrect(word, candidates, fn, SIMILARITY_LIMIT)
+            if fn is cats.minimum_mewtations:
+                # Same choice as minimum_mewtations, without the recursion.
+                guess = mewtations.autocorrect(word, candidates, SIMILARITY_LIMIT)
+            else:
+                guess = cats.autocorrect(word, candidates, fn, SIMILARITY_LIMIT)
             return reformat(guess, raw_word)
         except BaseException:
             pass
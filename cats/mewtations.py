@@ -0,0 +1,118 @@
+"""Bit-parallel edit distances for autocorrect.
+
+minimum_mewtations computes an edit distance by recursion on slices of its
+arguments, which allocates new strings and cache entries at every step. The
+functions here compute the same distances column by column: each column of
+the edit distance table is kept as the bits of two integers, where bit i
+tells whether the distance goes up or down from row i to row i + 1, and the
+whole column is updated at once for each letter of the source word. The work
+that depends only on the typed word is done once, so comparing one typed
+word against many candidates (see distances) costs one pass per candidate.
+"""
+
+from collections.abc import Callable
+
+
+def edit_distance(typed: str, source: str, limit: int | None = None) -> int:
+    """Return the edit distance from TYPED to SOURCE, the number of letters
+    that must be added, removed or substituted. If it is more than LIMIT,
+    return LIMIT + 1 instead.
+
+    The result is the same as that of minimum_mewtations when the distance
+    is at most LIMIT, and is more than LIMIT when that of minimum_mewtations
+    is, so autocorrect makes the same choices with either.
+
+    >>> edit_distance('ckiteus', 'kittens')
+    3
+    >>> edit_distance('ckiteus', 'kittens', 2), edit_distance('ckiteus', 'kittens', 3)
+    (3, 3)
+    >>> edit_distance('', 'cats'), edit_distance('cats', ''), edit_distance('cats', 'cats', 0)
+    (4, 4, 0)
+    >>> [edit_distance('rut', 'rzumt', k) > k for k in range(5)]
+    [True, True, False, False, False]
+    """
+    return distance_from(typed, limit)(source)
+
+
+def distance_from(typed: str, limit: int | None = None) -> Callable[[str], int]:
+    """Return a function that takes a SOURCE and returns edit_distance(TYPED,
+    SOURCE, LIMIT), so that the work that depends only on TYPED is done once.
+
+    A source whose length differs from that of TYPED by more than LIMIT is
+    rejected without comparing letters, and a comparison stops as soon as
+    the letters left in the source can no longer bring the distance within
+    LIMIT.
+
+    >>> distance = distance_from('cst')
+    >>> distance('cats'), distance('cast'), distance('')
+    (2, 1, 3)
+    >>> distance = distance_from('cst', 1)
+    >>> distance('cats'), distance('cast'), distance('')
+    (2, 1, 2)
+    """
+    bound = float('inf') if limit is None else limit
+    if not typed:
+        return lambda source: min(len(source), bound + 1)
+    matches: dict[str, int] = {}
+    for i, letter in enumerate(typed):
+        matches[letter] = matches.get(letter, 0) | 1 << i
+    match_of = matches.get
+    length = len(typed)
+    mask = (1 << length) - 1
+    last = 1 << (length - 1)
+
+    def distance_to(source: str) -> int:
+        remaining = len(source)
+        if abs(remaining - length) > bound:
+            return bound + 1
+        up, down, distance = mask, 0, length
+        for letter in source:
+            match = match_of(letter, 0)
+            vertical = match | down
+            horizontal = (((match & up) + up) ^ up) | match
+            right_up = down | (mask & ~(horizontal | up))
+            right_down = up & horizontal
+            if right_up & last:
+                distance += 1
+            elif right_down & last:
+                distance -= 1
+            remaining -= 1
+            # Each letter left changes the distance by at most one.
+            if distance - remaining > bound:
+                return bound + 1
+            right_up = (right_up << 1) | 1
+            right_down = (right_down << 1) & mask
+            up = right_down | (mask & ~(vertical | right_up))
+            down = right_up & vertical
+        return distance
+
+    return distance_to
+
+
+def distances(typed: str, sources: list[str], limit: int | None = None) -> list[int]:
+    """Return edit_distance(TYPED, source, LIMIT) for each of SOURCES.
+
+    >>> distances('wird', ['wiry', 'bird', 'wir', 'bwird', 'wind', 'award'], 1)
+    [1, 1, 1, 1, 1, 2]
+    """
+    return list(map(distance_from(typed, limit), sources))
+
+
+def autocorrect(typed_word: str, word_list: list[str], limit: int) -> str:
+    """Return the same word as autocorrect(TYPED_WORD, WORD_LIST,
+    minimum_mewtations, LIMIT): the element of WORD_LIST closest to
+    TYPED_WORD, the earliest among ties, or TYPED_WORD if it is in WORD_LIST
+    or no element is within LIMIT edits.
+
+    >>> autocorrect('tesng', ['tasting', 'testing', 'resting'], 2)
+    'testing'
+    >>> autocorrect('tesng', ['tasting', 'testing', 'resting'], 1)
+    'tesng'
+    """
+    if typed_word in word_list:
+        return typed_word
+    diff_list = distances(typed_word, word_list, limit)
+    index = min(range(len(diff_list)), key=diff_list.__getitem__)
+    if diff_list[index] > limit:
+        return typed_word
+    return word_list[index]
@@ -0,0 +1,164 @@
+"""Symmetric-delete autocorrect.
+
+Two words within d edits of each other have a common string obtained by
+deleting at most d letters from each. A DeleteIndex maps every string
+obtained by deleting up to MAX_DISTANCE letters from each word of a word list
+to that word, so a lookup only has to generate the deletions of the typed
+word and compare it with the few words they lead to, instead of with every
+word in the list.
+
+The index is saved to a file as a header followed by three blocks:
+
+    keys      uint32  CRC-32 of each deletion, sorted
+    postings  uint32  the index in the word list of the word of each key
+    words     utf-8   the word list, one word per line
+
+and loaded by memory-mapping it. Two deletions with the same CRC only add a
+candidate word that is then rejected by comparing it with the typed word.
+
+    python3 symspell.py --build              # Build data/words.deletes
+    python3 symspell.py --benchmark          # Compare with a linear scan
+"""
+
+import struct
+import zlib
+from itertools import combinations
+
+import numpy as np
+from mewtations import autocorrect as linear_autocorrect, distance_from
+from ucb import main
+from utils import lines_from_file, lower, remove_punctuation
+
+MAX_DISTANCE = 2
+INDEX_FILE = 'data/words.deletes'
+MAGIC = b'CATSDELS'
+HEADER = struct.Struct('<8sIII')  # Magic, max distance, number of keys, bytes of words.
+
+
+def deletions(word: str, max_distance: int = MAX_DISTANCE) -> set[str]:
+    """Return the strings obtained by deleting at most MAX_DISTANCE letters
+    from WORD, including WORD itself.
+
+    >>> sorted(deletions('cat', 1))
+    ['at', 'ca', 'cat', 'ct']
+    >>> len(deletions('cats')), len(deletions('a'))
+    (11, 2)
+    """
+    found = {word}
+    for k in range(1, min(max_distance, len(word)) + 1):
+        for dropped in combinations(range(len(word)), k):
+            found.add(''.join(letter for i, letter in enumerate(word) if i not in dropped))
+    return found
+
+
+def key(deletion: str) -> int:
+    return zlib.crc32(deletion.encode())
+
+
+class DeleteIndex:
+    """An index of the deletions of WORDS, or of the words in the index file
+    at PATH if WORDS is None.
+
+    >>> index = DeleteIndex(['cats', 'scat', 'cast', 'kittens', 'cat'])
+    >>> index.autocorrect('cst', 1), index.autocorrect('ckiteus', 3), index.autocorrect('ckiteus', 2)
+    ('cast', 'kittens', 'ckiteus')
+    >>> index.candidates('cst', 1)
+    [0, 1, 2, 4]
+    """
+
+    def __init__(self, words: list[str] | None = None, max_distance: int = MAX_DISTANCE, path: str = INDEX_FILE):
+        if words is None:
+            self.load(path)
+            return
+        self.words, self.max_distance = words, max_distance
+        keys, postings, first = [], [], set()
+        for index, word in enumerate(words):
+            if word not in first:
+                first.add(word)
+                for deletion in deletions(word, max_distance):
+                    keys.append(key(deletion))
+                    postings.append(index)
+        keys = np.array(keys, dtype=np.uint32)
+        order = np.argsort(keys, kind='stable')
+        self.keys, self.postings = keys[order], np.array(postings, dtype=np.uint32)[order]
+
+    def save(self, path: str = INDEX_FILE) -> None:
+        """Save the index to PATH."""
+        words = '\n'.join(self.words).encode()
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.max_distance, len(self.keys), len(words)))
+            f.write(self.keys.tobytes())
+            f.write(self.postings.tobytes())
+            f.write(words)
+
+    def load(self, path: str) -> None:
+        """Memory-map the index saved to PATH."""
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+        magic, self.max_distance, size, length = HEADER.unpack_from(data)
+        assert magic == MAGIC, f'{path} is not a deletion index'
+        offset = HEADER.size
+        self.keys = data[offset : offset + 4 * size].view(np.uint32)
+        self.postings = data[offset + 4 * size : offset + 8 * size].view(np.uint32)
+        self.words = data[offset + 8 * size : offset + 8 * size + length].tobytes().decode().split('\n')
+
+    def candidates(self, typed_word: str, limit: int) -> list[int]:
+        """Return the indices of the words that share a deletion of at most
+        LIMIT letters with TYPED_WORD, in order."""
+        probes = np.array([key(deletion) for deletion in deletions(typed_word, limit)], dtype=np.uint32)
+        starts = np.searchsorted(self.keys, probes, 'left')
+        ends = np.searchsorted(self.keys, probes, 'right')
+        hits = [self.postings[start:end] for start, end in zip(starts, ends) if start < end]
+        return np.unique(np.concatenate(hits)).tolist() if hits else []
+
+    def autocorrect(self, typed_word: str, limit: int) -> str:
+        """Return the same word as autocorrect(TYPED_WORD, words,
+        minimum_mewtations, LIMIT) for the words of the index. Limits above
+        the index's max distance fall back to comparing every word."""
+        if limit > self.max_distance:
+            return linear_autocorrect(typed_word, self.words, limit)
+        if limit < 0:
+            return typed_word
+        distance_to = distance_from(typed_word, limit)
+        best = (limit + 1, 0)
+        for index in self.candidates(typed_word, limit):
+            best = min(best, (distance_to(self.words[index]), index))
+        return self.words[best[1]] if best[0] <= limit else typed_word
+
+
+@main
+def run(*args):
+    """Build the deletion index of data/words.txt or benchmark it."""
+    import argparse
+    import pickle
+    import time
+
+    parser = argparse.ArgumentParser(description='Symmetric-delete autocorrect')
+    parser.add_argument('--build', action='store_true', help='Build the index from the word list')
+    parser.add_argument('--benchmark', action='store_true', help='Compare the index with a linear scan')
+    parser.add_argument('--words-file', default='data/words.txt', help='Word list to index')
+    parser.add_argument('--index', default=INDEX_FILE, help='Index file to save or load')
+    parser.add_argument('--limit', type=int, default=MAX_DISTANCE, help='Largest number of edits')
+    parser.add_argument('--sample', type=int, default=50, help='Typos to correct with the linear scan')
+    args = parser.parse_args()
+
+    if args.build:
+        start = time.perf_counter()
+        index = DeleteIndex(lines_from_file(args.words_file))
+        index.save(args.index)
+        print(f'Indexed {len(index.keys)} deletions in {time.perf_counter() - start:.1f}s')
+    if args.benchmark:
+        start = time.perf_counter()
+        index = DeleteIndex(path=args.index)
+        print(f'Loaded the index in {(time.perf_counter() - start) * 1000:.1f}ms')
+        with open('data/testcases.out', 'rb') as f:
+            typos = [lower(remove_punctuation(typo)) for typos in pickle.load(f).values() for typo in typos]
+        start = time.perf_counter()
+        corrections = [index.autocorrect(typo, args.limit) for typo in typos]
+        indexed = (time.perf_counter() - start) / len(typos)
+        sample = typos[: args.sample]
+        start = time.perf_counter()
+        expected = [linear_autocorrect(typo, index.words, args.limit) for typo in sample]
+        linear = (time.perf_counter() - start) / len(sample)
+        mismatches = sum(a != b for a, b in zip(corrections, expected))
+        print(f'Index: {indexed * 1000:.3f}ms per word over {len(typos)} typos')
+        print(f'Linear scan: {linear * 1000:.1f}ms per word over {len(sample)} typos ({linear / indexed:.0f}x slower, {mismatches} mismatches)')
@@ -1,11 +1,14 @@
 """The UCB module contains functions specific to 61A projects at UC Berkeley."""
 
+import atexit
 import code
 import functools
 import inspect
+import os
 import re
 import signal
 import sys
+import time
 
 
 def main(fn):
@@ -25,6 +28,14 @@ def main(fn):
     return fn
 
 _PREFIX = ''
+
+# UCB_TRACE selects what trace does: 'print' each call, 'profile' calls into a
+# report printed at exit, or 'off' to leave functions untraced.
+TRACE_MODE = os.environ.get('UCB_TRACE', 'print')
+TRACE_SAMPLE = max(1, int(os.environ.get('UCB_TRACE_SAMPLE', '1')))  # Profile 1 call in N, at least 1.
+TRACE_BUFFER = max(1, int(os.environ.get('UCB_TRACE_BUFFER', '65536')))  # Call events kept, at least 1.
+
+
 def trace(fn):
     """A decorator that prints a function's name, its arguments, and its return
     values each time the function is called. For example,
@@ -32,7 +43,14 @@ def trace(fn):
     @trace
     def compute_something(x, y):
         # function body
+
+    Set the environment variable UCB_TRACE to 'profile' to record calls with
+    profile_trace instead, or to 'off' to leave functions untraced.
     """
+    if TRACE_MODE == 'off':
+        return fn
+    if TRACE_MODE == 'profile':
+        return profile_trace(fn)
     @functools.wraps(fn)
     def wrapped(*args, **kwds):
         global _PREFIX
@@ -53,6 +71,102 @@ def trace(fn):
     return wrapped
 
 
+_events = []  # Ring buffer of call events.
+_events_recorded = 0
+_stats = {}  # Calls, profiled calls, total ns, self ns.
+_active = {}  # Profiled calls of each function in progress.
+_child_times = []  # Time spent in profiled callees of each profiled call.
+_roots = [0, 0, 0]  # Outermost calls, profiled ones, and unprofiled ones in progress.
+
+
+def profile_trace(fn):
+    """A decorator that profiles calls of fn without printing anything. Each
+    profiled call adds its duration to the report printed at exit (see
+    trace_report) and a (name, argument digest, duration in ns, depth) event
+    to a ring buffer of the last TRACE_BUFFER events (see trace_events).
+
+    Calls are sampled by their outermost traced call: 1 in TRACE_SAMPLE of
+    those is profiled together with every traced call it makes, and the
+    others are only counted.
+
+    Profiling is not thread-safe.
+    """
+    name = fn.__qualname__
+    stats = _stats.setdefault(name, [0, 0, 0, 0])
+    if not _events:
+        _events.extend([None] * TRACE_BUFFER)
+        atexit.register(print_trace_report)
+
+    @functools.wraps(fn)
+    def wrapped(*args, **kwds):
+        global _events_recorded
+        stats[0] += 1
+        if not _child_times:
+            if _roots[2]:  # Within an outermost call that isn't profiled
+                return fn(*args, **kwds)
+            _roots[0] += 1
+            if (_roots[0] - 1) % TRACE_SAMPLE:  # Profile the first and every TRACE_SAMPLE-th after it.
+                _roots[2] += 1
+                try:
+                    return fn(*args, **kwds)
+                finally:
+                    _roots[2] -= 1
+            _roots[1] += 1
+        stats[1] += 1
+        active = _active.get(name, 0)
+        _active[name] = active + 1
+        _child_times.append(0)
+        start = time.perf_counter_ns()
+        try:
+            return fn(*args, **kwds)
+        finally:
+            duration = time.perf_counter_ns() - start
+            _active[name] = active
+            if not active:  # Count recursive calls in the outermost call only.
+                stats[2] += duration
+            stats[3] += duration - _child_times.pop()
+            if _child_times:
+                _child_times[-1] += duration
+            _events[_events_recorded % len(_events)] = (name, _digest(args, kwds), duration, len(_child_times))
+            _events_recorded += 1
+
+    return wrapped
+
+
+def _digest(args, kwds):
+    """Return a hash of the arguments of a call, without formatting them."""
+    try:
+        return hash((args, frozenset(kwds.items()))) if kwds else hash(args)
+    except TypeError:  # Unhashable arguments, such as lists
+        return hash(tuple(type(arg).__name__ for arg in args))
+
+
+def trace_events():
+    """Return the recorded (name, argument digest, duration in ns, depth) call
+    events still in the ring buffer, oldest first."""
+    start = max(0, _events_recorded - len(_events))
+    return [_events[i % len(_events)] for i in range(start, _events_recorded)]
+
+
+def trace_report():
+    """Return (name, calls, profiled calls, total seconds, self seconds) for
+    each traced function, most self time first. The times of the sampled
+    outermost calls are scaled up to all of them."""
+    report = []
+    scale = _roots[0] / _roots[1] / 1e9 if _roots[1] else 0
+    for name, (calls, profiled, total, own) in _stats.items():
+        report.append((name, calls, profiled, total * scale, own * scale))
+    return sorted(report, key=lambda row: -row[4])
+
+
+def print_trace_report(file=None):
+    """Print the trace report to FILE (standard error by default)."""
+    file = file or sys.stderr
+    print('{0:<40}{1:>12}{2:>12}{3:>12}{4:>12}'.format('function', 'calls', 'profiled', 'total s', 'self s'), file=file)
+    for name, calls, profiled, total, own in trace_report():
+        print('{0:<40}{1:>12}{2:>12}{3:>12.6f}{4:>12.6f}'.format(name, calls, profiled, total, own), file=file)
+
+
 def log(message):
     """Print an indented message (used with trace)."""
     print(_PREFIX + re.sub('\n', '\n' + _PREFIX, str(message)))
@@ -1,6 +1,7 @@
 "Utility functions for file and string manipulation"
 
 import string
+from collections import OrderedDict
 from collections.abc import Callable
 from math import sqrt
 from typing import Any
@@ -150,3 +151,54 @@ def deep_convert_to_tuple(sequence) -> tuple[Any, ...] | Any:
         return tuple(deep_convert_to_tuple(item) for item in sequence)
     else:
         return sequence
+
+
+class Fingerprint:
+    """The contents of a sequence, as a tuple, with its hash computed once.
+    Fingerprints with the same hash are equal only if their contents are."""
+
+    __slots__ = ('contents', 'hash')
+
+    def __init__(self, contents: tuple):
+        self.contents = contents
+        self.hash = hash(contents)
+
+    def __hash__(self) -> int:
+        return self.hash
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Fingerprint) or self.hash != other.hash:
+            return False
+        return self.contents is other.contents or self.contents == other.contents
+
+
+_fingerprints: OrderedDict[int, tuple[list | tuple, int, Fingerprint]] = OrderedDict()
+MAX_FINGERPRINTS = 16  # Sequences whose fingerprints are remembered.
+
+
+def fingerprint(sequence: list | tuple) -> Fingerprint:
+    """Return a hashable fingerprint of the contents of SEQUENCE, computed
+    once per sequence and then looked up by identity while its length stays
+    the same. Replacing elements of a list in place without changing its
+    length is not noticed.
+
+    >>> words = ['cats', 'dogs']
+    >>> fingerprint(words) == fingerprint(['cats', 'dogs']), fingerprint(words) == fingerprint(['dogs'])
+    (True, False)
+    >>> words.append('mice')
+    >>> fingerprint(words) == fingerprint(('cats', 'dogs', 'mice'))
+    True
+    >>> hash(fingerprint([-1])) == hash(fingerprint([-2])), fingerprint([-1]) == fingerprint([-2])
+    (True, False)
+    """
+    seen = _fingerprints.get(id(sequence))
+    if seen is not None and seen[0] is sequence and seen[1] == len(sequence):
+        _fingerprints.move_to_end(id(sequence))
+        return seen[2]
+    # Keeping SEQUENCE alive keeps its id from being reused by another object.
+    result = Fingerprint(deep_convert_to_tuple(sequence))
+    _fingerprints[id(sequence)] = (sequence, len(sequence), result)
+    _fingerprints.move_to_end(id(sequence))
+    if len(_fingerprints) > MAX_FINGERPRINTS:
+        _fingerprints.popitem(last=False)
+    return result
@@ -0,0 +1,176 @@
+"""Vectorized simulation of many independent games of Hog.
+
+The functions in this module mirror hog.play, but advance N games in lockstep
+using NumPy arrays. Strategies are given as roll tables: integer arrays of
+shape (goal, goal) whose entry [score, opponent_score] is the number of dice
+the current player rolls.
+"""
+
+from collections.abc import Callable
+
+import numpy as np
+from compiled import compile_strategy, is_compiled
+
+from hog import GOAL, always_roll, simple_update, sus_points, sus_update
+
+MAX_ROLLS = 10  # A player may roll at most 10 dice on a turn.
+SIDES = 6  # Batch games are played with fair six-sided dice by default.
+MAX_BOAR_BRAWL = 27  # The most points that rolling 0 dice can score.
+
+
+def max_turn_points(sides: int = SIDES) -> int:
+    """Return the most points a single turn can score with SIDES-sided dice.
+
+    >>> max_turn_points(6), max_turn_points(2)
+    (60, 27)
+    """
+    return max(MAX_ROLLS * sides, MAX_BOAR_BRAWL)
+
+
+def score_dtype(bound: int) -> type:
+    """Return the smallest integer dtype (int16 or int32) that holds scores
+    up to BOUND."""
+    return np.int16 if bound <= np.iinfo(np.int16).max else np.int32
+
+
+def roll_table(strategy: Callable[[int, int], int], goal: int = GOAL) -> np.ndarray:
+    """Return the roll table of STRATEGY for a game that goes to GOAL points.
+    STRATEGY may be an ordinary or a compiled strategy.
+
+    Note that tabulating a strategy that rolls dice internally freezes one
+    sample of its choices.
+
+    >>> table = roll_table(always_roll(3))
+    >>> table.shape, int(table[0, 0]), int(table[99, 99])
+    ((100, 100), 3, 3)
+    """
+    return np.frombuffer(compile_strategy(strategy, goal).table, dtype=np.int8).reshape(goal, goal)
+
+
+def as_roll_table(table, goal: int = GOAL) -> np.ndarray:
+    """Return TABLE as a roll table, where TABLE is a roll table or a compiled
+    strategy for GOAL."""
+    if is_compiled(table):
+        return roll_table(table, goal)
+    return np.asarray(table, dtype=np.int8)
+
+
+def boar_brawl_batch(player_score: np.ndarray, opponent_score: np.ndarray) -> np.ndarray:
+    """Return the points scored by rolling 0 dice for each pair of scores.
+
+    >>> boar_brawl_batch(np.array([21, 52]), np.array([46, 71])).tolist()
+    [9, 15]
+    """
+    return np.maximum(np.abs(player_score % 10 - opponent_score // 10 % 10) * 3, 1)
+
+
+def roll_dice_batch(num_rolls: np.ndarray, rng: np.random.Generator, sides: int = SIDES) -> np.ndarray:
+    """Return the outcome of rolling NUM_ROLLS[i] > 0 dice for each i, scoring
+    1 for any turn in which a 1 is rolled.
+    """
+    width = int(num_rolls.max())
+    rolls = rng.integers(1, sides + 1, size=(width, len(num_rolls)), dtype=np.uint8 if sides <= 255 else np.uint16)
+    total = np.zeros(len(num_rolls), dtype=score_dtype(MAX_ROLLS * sides))
+    sow_sad = np.zeros(len(num_rolls), dtype=bool)
+    for k in range(width):  # Row k holds the k-th die of every turn.
+        used = num_rolls > k
+        total += np.where(used, rolls[k], 0)
+        sow_sad |= used & (rolls[k] == 1)
+    return np.where(sow_sad, 1, total)
+
+
+def take_turn_batch(num_rolls: np.ndarray, player_score: np.ndarray, opponent_score: np.ndarray, rng: np.random.Generator, sides: int = SIDES) -> np.ndarray:
+    """Return the points scored on a turn for each game, like hog.take_turn."""
+    points = np.empty(len(num_rolls), dtype=score_dtype(max_turn_points(sides)))
+    brawling = num_rolls == 0
+    points[brawling] = boar_brawl_batch(player_score[brawling], opponent_score[brawling])
+    rolling = ~brawling
+    if rolling.any():
+        points[rolling] = roll_dice_batch(num_rolls[rolling], rng, sides)
+    return points
+
+
+def make_sus_table(size: int) -> np.ndarray:
+    """Return an array whose entry s is sus_points(s) for every s < SIZE."""
+    # Sus Fuss moves a score to the next prime, which is less than twice as large.
+    return np.fromiter((sus_points(score) for score in range(size)), dtype=score_dtype(2 * size), count=size)
+
+
+def make_update_batch(update: Callable[..., int], goal: int = GOAL, sides: int = SIDES) -> Callable[[np.ndarray, np.ndarray, np.ndarray, np.random.Generator], np.ndarray]:
+    """Return the array version of UPDATE, which is either simple_update or
+    sus_update, for a game that goes to GOAL points with SIDES-sided dice.
+    """
+    if update is simple_update:
+
+        def simple_update_batch(num_rolls, player_score, opponent_score, rng):
+            return player_score + take_turn_batch(num_rolls, player_score, opponent_score, rng, sides)
+
+        return simple_update_batch
+    if update is sus_update:
+        sus_table = make_sus_table(goal + max_turn_points(sides) + 1)
+
+        def sus_update_batch(num_rolls, player_score, opponent_score, rng):
+            return sus_table[player_score + take_turn_batch(num_rolls, player_score, opponent_score, rng, sides)]
+
+        return sus_update_batch
+    raise ValueError('update must be simple_update or sus_update')
+
+
+def play_batch(
+    table0: np.ndarray,
+    table1: np.ndarray,
+    update: Callable[..., int],
+    num_games: int,
+    score0: int = 0,
+    score1: int = 0,
+    goal: int = GOAL,
+    seed: int | np.random.SeedSequence | None = None,
+    sides: int = SIDES,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Simulate NUM_GAMES independent games and return the arrays of final
+    scores of both players, with Player 0's scores first.
+
+    Each game is played exactly as hog.play would play it with the strategies
+    whose roll tables are TABLE0 and TABLE1 (or compiled strategies), fair
+    SIDES-sided dice and UPDATE (simple_update or sus_update).
+
+    >>> table = roll_table(always_roll(5))
+    >>> scores0, scores1 = play_batch(table, table, sus_update, 1000, seed=61)
+    >>> bool(((scores0 >= GOAL) ^ (scores1 >= GOAL)).all())
+    True
+    """
+    rng = np.random.default_rng(seed)
+    update_batch = make_update_batch(update, goal, sides)
+    tables = (as_roll_table(table0, goal), as_roll_table(table1, goal))
+    # Sus Fuss can at most double a score that is below GOAL before the turn.
+    scores = np.empty((2, num_games), dtype=score_dtype(2 * (max(goal, score0, score1) + max_turn_points(sides))))
+    scores[0], scores[1] = score0, score1
+    active = np.flatnonzero((scores[0] < goal) & (scores[1] < goal))
+    who = 0  # Every game starts with Player 0, so turns stay in lockstep.
+    while len(active):
+        player_score, opponent_score = scores[who, active], scores[1 - who, active]
+        num_rolls = tables[who][player_score, opponent_score]
+        scores[who, active] = update_batch(num_rolls, player_score, opponent_score, rng)
+        active = active[scores[who, active] < goal]
+        who = 1 - who
+    return scores[0], scores[1]
+
+
+def average_win_rate_batch(
+    table: np.ndarray,
+    baseline: np.ndarray | None = None,
+    num_games: int = 1000,
+    seed: int | None = None,
+) -> float:
+    """Return the average win rate of the strategy with roll table TABLE
+    against BASELINE (always_roll(6) by default) under sus_update, averaging
+    NUM_GAMES games as player 0 and NUM_GAMES games as player 1.
+    """
+    if baseline is None:
+        baseline = roll_table(always_roll(6))
+    seeds = np.random.SeedSequence(seed).spawn(2)
+    scores0, scores1 = play_batch(table, baseline, sus_update, num_games, seed=seeds[0])
+    win_rate_as_player_0 = np.mean(scores0 > scores1)
+    scores0, scores1 = play_batch(baseline, table, sus_update, num_games, seed=seeds[1])
+    win_rate_as_player_1 = np.mean(scores0 <= scores1)
+    return float(win_rate_as_player_0 + win_rate_as_player_1) / 2
@@ -0,0 +1,159 @@
+"""Benchmarks for the Hog simulator.
+
+Each benchmark measures one hot path: games per second of play, turns per
+second of roll_dice, or the wall time of a whole computation. Results are
+saved as JSON, and compared against a baseline saved earlier so that a
+benchmark that got slower than the tolerance allows is flagged.
+
+    python3 benchmark.py --save-baseline   # Record the baseline
+    python3 benchmark.py                   # Compare against it
+"""
+
+import io
+import json
+import platform
+import random
+import sys
+import time
+from collections.abc import Callable
+from contextlib import redirect_stdout
+
+from dice import six_sided
+from ucb import main
+
+import hog
+
+RESULTS = 'benchmark_results.json'
+BASELINE = 'benchmark_baseline.json'
+TOLERANCE = 0.2  # Flag benchmarks more than 20% slower than the baseline.
+MIN_TIME = 0.2  # Seconds each measurement runs for, at least.
+REPEAT = 3  # Measurements of each benchmark; the best one counts.
+
+STRATEGIES = {
+    'always_roll(6)': hog.always_roll(6),
+    'catch_up': hog.catch_up,
+    'boar_strategy': hog.boar_strategy,
+    'sus_strategy': hog.sus_strategy,
+    'final_strategy': hog.final_strategy,
+}
+
+
+def measure(fn: Callable[[], object], min_time: float = MIN_TIME, repeat: int = REPEAT) -> float:
+    """Return the best number of calls of FN per second over REPEAT runs of
+    at least MIN_TIME seconds each. The random state is reset before each run
+    so that every run rolls the same dice.
+
+    >>> measure(lambda: None, min_time=0.01) > 1000
+    True
+    """
+    best = 0.0
+    for _ in range(repeat):
+        random.seed(61)
+        calls, start, elapsed = 0, time.perf_counter(), 0.0
+        while elapsed < min_time:
+            fn()
+            calls += 1
+            elapsed = time.perf_counter() - start
+        best = max(best, calls / elapsed)
+    return best
+
+
+def wall_time(fn: Callable[[], object], repeat: int = REPEAT) -> float:
+    """Return the best wall time in seconds of REPEAT calls of FN, with its
+    output suppressed."""
+    best = float('inf')
+    for _ in range(repeat):
+        random.seed(61)
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmarks(min_time: float = MIN_TIME, repeat: int = REPEAT, log=print) -> dict[str, dict]:
+    """Run every benchmark and return a dictionary from benchmark names to
+    their results, each a dictionary with a value, a unit and whether higher
+    values are better."""
+    results = {}
+
+    def record(name, value, unit, higher_is_better):
+        results[name] = {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+        log(f'{name:<48}{value:>14.1f} {unit}' if higher_is_better else f'{name:<48}{value:>14.4f} {unit}')
+
+    for update in (hog.simple_update, hog.sus_update):
+        for name, strategy in STRATEGIES.items():
+            rate = measure(lambda: hog.play(strategy, hog.always_roll(6), update), min_time, repeat)
+            record(f'play/{update.__name__}/{name}', rate, 'games/s', True)
+    for num_rolls in range(1, 11):
+        rate = measure(lambda: hog.roll_dice(num_rolls, six_sided), min_time, repeat)
+        record(f'roll_dice/{num_rolls}', rate, 'turns/s', True)
+    record('max_scoring_num_rolls', wall_time(hog.max_scoring_num_rolls, repeat), 's', False)
+    record('average_win_rate/final_strategy', wall_time(lambda: hog.average_win_rate(hog.final_strategy), repeat), 's', False)
+    record('run_experiments', wall_time(hog.run_experiments, 1), 's', False)
+    return results
+
+
+def save_results(results: dict[str, dict], path: str) -> None:
+    """Save RESULTS to PATH as JSON, with the machine they were measured on."""
+    with open(path, 'w') as f:
+        json.dump({'python': sys.version.split()[0], 'machine': platform.machine(), 'results': results}, f, indent=2)
+
+
+def load_results(path: str) -> dict[str, dict]:
+    """Return the results saved to PATH by save_results."""
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def regressions(results: dict[str, dict], baseline: dict[str, dict], tolerance: float = TOLERANCE) -> list[tuple[str, float]]:
+    """Return (name, change) for each benchmark in both RESULTS and BASELINE
+    that is more than TOLERANCE slower than in BASELINE, where change is the
+    relative change of its speed.
+
+    >>> baseline = {'a': {'value': 100.0, 'higher_is_better': True}, 'b': {'value': 2.0, 'higher_is_better': False}}
+    >>> results = {'a': {'value': 70.0, 'higher_is_better': True}, 'b': {'value': 2.1, 'higher_is_better': False}}
+    >>> regressions(results, baseline)
+    [('a', -0.3)]
+    """
+    flagged = []
+    for name, result in results.items():
+        if name in baseline:
+            # Compare speeds: the inverse of times.
+            ratio = result['value'] / baseline[name]['value']
+            if not result['higher_is_better']:
+                ratio = 1 / ratio
+            if ratio < 1 - tolerance:
+                flagged.append((name, round(ratio - 1, 4)))
+    return flagged
+
+
+@main
+def run(*args):
+    """Run the benchmarks and compare them against the baseline."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the Hog simulator')
+    parser.add_argument('--output', default=RESULTS, help='File to save the results to')
+    parser.add_argument('--baseline', default=BASELINE, help='Baseline to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='Save the results as the baseline instead')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='Slowdown flagged as a regression')
+    parser.add_argument('--min-time', type=float, default=MIN_TIME, help='Seconds each measurement runs for')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.min_time)
+    save_results(results, args.baseline if args.save_baseline else args.output)
+    if args.save_baseline:
+        print(f'Saved the baseline to {args.baseline}')
+        return
+    try:
+        baseline = load_results(args.baseline)
+    except FileNotFoundError:
+        print(f'No baseline at {args.baseline}; save one with --save-baseline')
+        return
+    flagged = regressions(results, baseline, args.tolerance)
+    for name, change in flagged:
+        print(f'REGRESSION {name}: {change:+.1%} speed')
+    if flagged:
+        sys.exit(1)
+    print(f'No benchmark is more than {args.tolerance:.0%} slower than the baseline')
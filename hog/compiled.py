@@ -0,0 +1,103 @@
+"""Strategies compiled into roll tables.
+
+A compiled strategy is a strategy function that looks up its choice in a flat
+array('b') table with one entry per pair of scores below a goal, instead of
+recomputing it. The table and goal are available as its TABLE and GOAL
+attributes. Compiled strategies are cached per strategy and goal, and pass
+scores of the goal or more to the strategy they were compiled from.
+"""
+
+from array import array
+from collections.abc import Callable, Sequence
+from types import MethodType
+from weakref import WeakKeyDictionary, WeakMethod, ref
+
+DEFAULT_GOAL = 100  # The GOAL of hog.py, which imports this module.
+
+_cache: WeakKeyDictionary = WeakKeyDictionary()
+
+
+def is_compiled(strategy: Callable[[int, int], int], goal: int | None = None) -> bool:
+    """Return whether STRATEGY is a compiled strategy (for GOAL, if given)."""
+    return hasattr(strategy, 'table') and (goal is None or strategy.goal == goal)
+
+
+def table_strategy(
+    table: Sequence[int],
+    goal: int = DEFAULT_GOAL,
+    fallback: Callable[[int, int], int] | None = None,
+) -> Callable[[int, int], int]:
+    """Return a compiled strategy that rolls TABLE[score * GOAL + opponent_score]
+    dice. Scores of GOAL or more are passed to FALLBACK, if there is one, and
+    negative scores are rejected.
+
+    >>> strategy = table_strategy([0, 1, 2, 3], 2)
+    >>> strategy(1, 0), strategy.goal, list(strategy.table)
+    (2, 2, [0, 1, 2, 3])
+    >>> strategy(-1, 1)
+    Traceback (most recent call last):
+    ...
+    ValueError: scores (-1, 1) are negative
+    """
+    table = array('b', table)
+    assert len(table) == goal * goal, 'A roll table needs one entry per pair of scores.'
+
+    def compiled(score: int, opponent_score: int) -> int:
+        if score < 0 or opponent_score < 0:
+            raise ValueError(f'scores ({score}, {opponent_score}) are negative')
+        if score < goal and opponent_score < goal:
+            return table[score * goal + opponent_score]
+        if fallback is None:
+            raise IndexError(f'scores ({score}, {opponent_score}) are outside the table for goal {goal}')
+        return fallback(score, opponent_score)
+
+    compiled.table = table  # type: ignore
+    compiled.goal = goal  # type: ignore
+    return compiled
+
+
+def weak_fallback(strategy: Callable[[int, int], int]) -> Callable[[int, int], int]:
+    """Return a function that calls STRATEGY through a weak reference, so
+    that a compiled strategy cached under STRATEGY doesn't keep it alive."""
+    try:
+        original = WeakMethod(strategy) if isinstance(strategy, MethodType) else ref(strategy)
+    except TypeError:  # Not every callable can be weakly referenced.
+        return strategy
+
+    def fallback(score: int, opponent_score: int) -> int:
+        strategy = original()
+        if strategy is None:
+            raise ReferenceError('the compiled strategy outlived the strategy it was compiled from')
+        return strategy(score, opponent_score)
+
+    return fallback
+
+
+def compile_strategy(strategy: Callable[[int, int], int], goal: int = DEFAULT_GOAL) -> Callable[[int, int], int]:
+    """Return STRATEGY compiled for a game that goes to GOAL points. STRATEGY is
+    called once for each pair of scores below GOAL, or not at all if it was
+    compiled before, and for scores of GOAL or more.
+
+    >>> calls = []
+    >>> def strategy(score, opponent_score):
+    ...     calls.append(score)
+    ...     return 4
+    >>> compiled = compile_strategy(strategy, 10)
+    >>> compiled(3, 5), len(calls)
+    (4, 100)
+    >>> compile_strategy(strategy, 10) is compiled, len(calls)
+    (True, 100)
+    >>> compiled(12, 5), len(calls)
+    (4, 101)
+    """
+    if is_compiled(strategy, goal):
+        return strategy
+    try:
+        by_goal = _cache.setdefault(strategy, {})
+    except TypeError:  # Not every callable can be weakly referenced.
+        by_goal = {}
+    if goal not in by_goal:
+        # A generator fills the table without a list of goal * goal ints.
+        table = array('b', (strategy(score, opponent_score) for score in range(goal) for opponent_score in range(goal)))
+        by_goal[goal] = table_strategy(table, goal, weak_fallback(strategy))
+    return by_goal[goal]
@@ -0,0 +1,111 @@
+"""Win rate estimation with common random numbers.
+
+Every game is identified by its number, and its die is seeded by that number.
+Each strategy plays game g in both seatings on the very same dice sequence,
+and, with antithetic pairing, again on its mirror image (each roll r replaced
+by 7 - r). Competing strategies play the same games, so their difference is
+estimated from paired outcomes: luck that helps both strategies equally
+cancels out instead of adding noise.
+
+Outcomes are averaged within a game, and the standard error comes from the
+spread of those per-game averages.
+"""
+
+import math
+import secrets
+from collections.abc import Callable, Sequence
+
+from dice import make_buffered_dice, make_mirrored_dice
+
+from hog import always_roll, play, sus_update
+
+BLOCK_SIZE = 256  # Random bytes drawn at a time; a game rarely needs more.
+
+
+def game_outcomes(
+    strategy: Callable[[int, int], int],
+    baseline: Callable[[int, int], int] = always_roll(6),
+    num_games: int = 1000,
+    seed: int | None = None,
+    antithetic: bool = True,
+) -> list[float]:
+    """Return the average outcome (1 for a win, 0 for a loss) of STRATEGY
+    against BASELINE over both seatings of each of NUM_GAMES games. With
+    ANTITHETIC, each game is also played on its mirrored dice.
+
+    >>> outcomes = game_outcomes(always_roll(6), num_games=3, seed=61)
+    >>> len(outcomes), all(outcome in (0, 0.25, 0.5, 0.75, 1) for outcome in outcomes)
+    (3, True)
+    """
+    if seed is None:
+        seed = secrets.randbits(64)
+    mirrors = (False, True) if antithetic else (False,)
+    outcomes = []
+    for game in range(num_games):
+        wins = 0
+        for mirrored in mirrors:
+            for seating in (0, 1):
+                # A new die with the same seed replays the same rolls.
+                dice = make_buffered_dice(6, f'{seed}:{game}', BLOCK_SIZE)
+                if mirrored:
+                    dice = make_mirrored_dice(dice)
+                if seating == 0:
+                    score0, score1 = play(strategy, baseline, sus_update, dice=dice)
+                    wins += score0 > score1
+                else:
+                    score0, score1 = play(baseline, strategy, sus_update, dice=dice)
+                    wins += score0 <= score1
+        outcomes.append(wins / (2 * len(mirrors)))
+    return outcomes
+
+
+def mean_and_error(samples: Sequence[float]) -> tuple[float, float]:
+    """Return the mean of SAMPLES and its standard error.
+
+    >>> mean, error = mean_and_error([0, 1, 0, 1])
+    >>> mean, round(error, 4)
+    (0.5, 0.2887)
+    """
+    n = len(samples)
+    mean = sum(samples) / n
+    variance = sum((sample - mean) ** 2 for sample in samples) / (n - 1)
+    return mean, math.sqrt(variance / n)
+
+
+def crn_win_rate(
+    strategy: Callable[[int, int], int],
+    baseline: Callable[[int, int], int] = always_roll(6),
+    num_games: int = 1000,
+    seed: int | None = None,
+    antithetic: bool = True,
+) -> tuple[float, float]:
+    """Return (win rate, standard error) of STRATEGY against BASELINE, played
+    in both seatings of NUM_GAMES games that share their dice.
+
+    A strategy playing itself wins exactly one seating of every game.
+
+    >>> crn_win_rate(always_roll(6), num_games=20, seed=61)
+    (0.5, 0.0)
+    """
+    return mean_and_error(game_outcomes(strategy, baseline, num_games, seed, antithetic))
+
+
+def compare_strategies(
+    strategy0: Callable[[int, int], int],
+    strategy1: Callable[[int, int], int],
+    baseline: Callable[[int, int], int] = always_roll(6),
+    num_games: int = 1000,
+    seed: int | None = None,
+    antithetic: bool = True,
+) -> tuple[float, float]:
+    """Return (difference, standard error) between the win rates of STRATEGY0
+    and STRATEGY1 against BASELINE, both playing the same NUM_GAMES games.
+
+    >>> compare_strategies(always_roll(5), always_roll(5), num_games=10, seed=61)
+    (0.0, 0.0)
+    """
+    if seed is None:
+        seed = secrets.randbits(64)
+    outcomes0 = game_outcomes(strategy0, baseline, num_games, seed, antithetic)
+    outcomes1 = game_outcomes(strategy1, baseline, num_games, seed, antithetic)
+    return mean_and_error([a - b for a, b in zip(outcomes0, outcomes1)])
@@ -5,7 +5,8 @@ A dice function takes no arguments and returns a number from 1 to n
 
 Fair dice produce each possible outcome with equal probability.
 Two fair dice are already defined, four_sided and six_sided,
-and are generated by the make_fair_dice function.
+and are generated by the make_fair_dice function. Simulations that roll many
+dice can use make_buffered_dice, which draws its rolls in large blocks.
 
 Test dice are deterministic: they always cycles through a fixed
 sequence of values that are passed as arguments.
@@ -13,7 +14,9 @@ Test dice are generated by the make_test_dice function.
 """
 
 from collections.abc import Callable
-from random import randint
+from functools import partial
+from itertools import chain
+from random import Random, randint
 
 
 def make_fair_dice(sides: int) -> Callable[[], int]:
@@ -23,9 +26,59 @@ def make_fair_dice(sides: int) -> Callable[[], int]:
     def dice() -> int:
         return randint(1, sides)
 
+    dice.sides = sides  # type: ignore
     return dice
 
 
+def make_buffered_dice(sides: int, seed: int | str | None = None, block_size: int = 4096) -> Callable[[], int]:
+    """Return a fair die seeded with SEED that draws its rolls BLOCK_SIZE at a
+    time and hands them out one per call.
+
+    Each block is made from random bytes: bytes that would favor some sides
+    are mapped to 0 and dropped, and the rest are mapped to the sides 1 to
+    SIDES, all without a Python-level loop.
+
+    >>> dice = make_buffered_dice(6, 61)
+    >>> rolls = [dice() for _ in range(10000)]
+    >>> min(rolls), max(rolls)
+    (1, 6)
+    >>> same_dice = make_buffered_dice(6, 61)
+    >>> rolls == [same_dice() for _ in range(10000)]
+    True
+    """
+    assert type(sides) == int and 1 <= sides <= 255, 'Illegal value for sides'
+    rng = Random(seed)
+    limit = 256 - 256 % sides  # Bytes below LIMIT are spread evenly over the sides.
+    faces = bytes(b % sides + 1 if b < limit else 0 for b in range(256))
+
+    def blocks():
+        while True:
+            yield rng.randbytes(block_size).translate(faces).replace(b'\0', b'')
+
+    # Calling next on the chained blocks runs entirely in C between refills.
+    dice = partial(next, chain.from_iterable(blocks()))
+    dice.sides = sides  # type: ignore
+    return dice
+
+
+def make_mirrored_dice(dice: Callable[[], int]) -> Callable[[], int]:
+    """Return a die that rolls SIDES + 1 - r whenever fair DICE would roll r.
+    The two dice are equally fair but negatively correlated (antithetic).
+
+    >>> mirrored = make_mirrored_dice(make_buffered_dice(6, 61))
+    >>> dice = make_buffered_dice(6, 61)
+    >>> [mirrored() + dice() for _ in range(5)]
+    [7, 7, 7, 7, 7]
+    """
+    sides: int = dice.sides  # type: ignore
+
+    def mirrored() -> int:
+        return sides + 1 - dice()
+
+    mirrored.sides = sides  # type: ignore
+    return mirrored
+
+
 four_sided: Callable[[], int] = make_fair_dice(4)
 six_sided: Callable[[], int] = make_fair_dice(6)
 
@@ -58,4 +111,5 @@ def make_test_dice(*outcomes: int) -> Callable[[], int]:
         index = (index + 1) % len(outcomes)
         return outcomes[index]
 
+    dice.outcomes = outcomes  # type: ignore
     return dice
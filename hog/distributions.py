@@ -0,0 +1,102 @@
+"""Exact probability distributions of dice outcomes.
+
+A distribution is a dictionary that maps each possible outcome to its
+probability as a Fraction. Distributions are available for the fair dice made
+by make_fair_dice and the cyclic dice made by make_test_dice. A test dice is
+treated as starting at a uniformly random point of its cycle, which is the
+long-run average over a sequence of calls.
+"""
+
+from collections.abc import Callable
+from fractions import Fraction
+from functools import cache
+
+Distribution = dict[int, Fraction]
+
+
+def dice_key(dice: Callable[[], int]) -> tuple:
+    """Return a hashable description of DICE that determines its outcomes.
+
+    >>> from dice import make_fair_dice, make_test_dice
+    >>> dice_key(make_fair_dice(4))
+    ('fair', 4)
+    >>> dice_key(make_test_dice(1, 2))
+    ('cycle', (1, 2))
+    """
+    if hasattr(dice, 'sides'):
+        return ('fair', dice.sides)
+    if hasattr(dice, 'outcomes'):
+        return ('cycle', tuple(dice.outcomes))
+    raise ValueError('Only dice made by make_fair_dice or make_test_dice have a known distribution.')
+
+
+def dice_distribution(dice: Callable[[], int]) -> Distribution:
+    """Return the distribution of a single outcome of DICE.
+
+    >>> from dice import make_test_dice
+    >>> dice_distribution(make_test_dice(1, 2, 2))
+    {1: Fraction(1, 3), 2: Fraction(2, 3)}
+    """
+    return dict(_dice_distribution(dice_key(dice)))
+
+
+def roll_dice_distribution(num_rolls: int, dice: Callable[[], int]) -> Distribution:
+    """Return the distribution of roll_dice(NUM_ROLLS, DICE) for NUM_ROLLS > 0.
+
+    >>> from dice import make_fair_dice, make_test_dice
+    >>> dist = roll_dice_distribution(2, make_fair_dice(6))
+    >>> dist[1], dist[12], sum(dist.values())
+    (Fraction(11, 36), Fraction(1, 36), Fraction(1, 1))
+    >>> roll_dice_distribution(2, make_test_dice(1, 6))
+    {1: Fraction(1, 1)}
+    """
+    assert num_rolls > 0, 'Must roll at least once.'
+    return dict(_roll_dice_distribution(num_rolls, dice_key(dice)))
+
+
+def expected_value(dist: Distribution) -> Fraction:
+    """Return the mean of the distribution DIST.
+
+    >>> from dice import six_sided
+    >>> expected_value(roll_dice_distribution(1, six_sided))
+    Fraction(7, 2)
+    """
+    return sum((outcome * p for outcome, p in dist.items()), Fraction(0))
+
+
+@cache
+def _dice_distribution(key: tuple) -> tuple[tuple[int, Fraction], ...]:
+    kind, param = key
+    if kind == 'fair':
+        return tuple((outcome, Fraction(1, param)) for outcome in range(1, param + 1))
+    counts: dict[int, int] = {}
+    for outcome in param:
+        counts[outcome] = counts.get(outcome, 0) + 1
+    return tuple((outcome, Fraction(n, len(param))) for outcome, n in sorted(counts.items()))
+
+
+@cache
+def _roll_dice_distribution(num_rolls: int, key: tuple) -> tuple[tuple[int, Fraction], ...]:
+    kind, param = key
+    dist: Distribution = {}
+    if kind == 'fair':
+        # Convolve the outcomes without a 1; every other roll scores 1 point.
+        face = [(outcome, p) for outcome, p in _dice_distribution(key) if outcome != 1]
+        totals: Distribution = {0: Fraction(1)}
+        for _ in range(num_rolls):
+            convolved: Distribution = {}
+            for total, p in totals.items():
+                for outcome, q in face:
+                    convolved[total + outcome] = convolved.get(total + outcome, 0) + p * q
+            totals = convolved
+        missing = 1 - sum(totals.values(), Fraction(0))
+        if missing:
+            dist[1] = missing
+        dist.update(totals)
+    else:
+        # Each start in the cycle is equally likely.
+        for start in range(len(param)):
+            rolls = [param[(start + k) % len(param)] for k in range(num_rolls)]
+            outcome = 1 if 1 in rolls else sum(rolls)
+            dist[outcome] = dist.get(outcome, 0) + Fraction(1, len(param))
+    return tuple(sorted(dist.items()))
@@ -1,11 +1,14 @@
 """The Game of Hog."""
 
-from bisect import bisect_left
 from collections.abc import Callable
+from fractions import Fraction
 from itertools import product
 from typing import Literal
 
+from compiled import is_compiled
 from dice import make_test_dice, six_sided
+from distributions import Distribution, expected_value, roll_dice_distribution
+from sus_fuss import sus_score
 from ucb import interact, main, trace
 
 GOAL = 100  # The goal of Hog is to score 100 points.
@@ -75,6 +78,25 @@ def take_turn(
     # END PROBLEM 3
 
 
+def take_turn_distribution(
+    num_rolls: int,
+    player_score: int,
+    opponent_score: int,
+    dice: Callable[[], int] = six_sided,
+) -> Distribution:
+    """Return the exact distribution of the points scored by
+    take_turn(NUM_ROLLS, PLAYER_SCORE, OPPONENT_SCORE, DICE).
+
+    >>> take_turn_distribution(0, 21, 46)
+    {9: Fraction(1, 1)}
+    >>> take_turn_distribution(1, 21, 46, make_test_dice(2, 4))
+    {2: Fraction(1, 2), 4: Fraction(1, 2)}
+    """
+    if num_rolls == 0:
+        return {boar_brawl(player_score, opponent_score): Fraction(1)}
+    return roll_dice_distribution(num_rolls, dice)
+
+
 def simple_update(
     num_rolls: int,
     player_score: int,
@@ -112,13 +134,8 @@ def sus_points(score: int) -> int:
     """Return the new score of a player taking into account the Sus Fuss rule."""
     # BEGIN PROBLEM 4
     '*** YOUR CODE HERE ***'
-    factors: int = num_factors(score)
-    if factors in (3, 4):
-        while True:
-            score += 1
-            if is_prime(score):
-                break
-    return score
+    # The factor counts and next primes are looked up in precomputed tables.
+    return sus_score(score)
     # END PROBLEM 4
 
 
@@ -163,7 +180,8 @@ def play(
 
     A strategy function, such as always_roll_5, takes the current player's
     score and their opponent's score and returns the number of dice the current
-    player chooses to roll.
+    player chooses to roll. A compiled strategy (see compiled.py) can be
+    used as well and answers with a table lookup.
 
     An update function, such as sus_update or simple_update, takes the number
     of dice to roll, the current player's score, the opponent's score, and the
@@ -244,9 +262,14 @@ def is_always_roll(
     True
     >>> is_always_roll(catch_up)
     False
+
+    Compiled strategies are checked by scanning their tables.
     """
     # BEGIN PROBLEM 7
     '*** YOUR CODE HERE ***'
+    if is_compiled(strategy, goal):
+        table = strategy.table  # type: ignore
+        return table.count(table[0]) == len(table)
     roll: int = strategy(0, 0)
     return all(strategy(i, j) == roll for i, j in product(range(goal), repeat=2))
     # END PROBLEM 7
@@ -278,17 +301,22 @@ def make_averaged(
 
 def max_scoring_num_rolls(
     dice: Callable[[], int] = six_sided,
-    times_called: int = 1000,
+    times_called: int | None = 1000,
 ) -> int:
     """Return the number of dice (1 to 10) that gives the maximum average score for a turn.
-    Assume that the dice always return positive outcomes.
+    Assume that the dice always return positive outcomes. If TIMES_CALLED is
+    None, compare the exact expected scores instead of sampled averages.
 
     >>> dice = make_test_dice(1, 6)
     >>> max_scoring_num_rolls(dice)
     1
+    >>> max_scoring_num_rolls(six_sided, times_called=None)
+    6
     """
     # BEGIN PROBLEM 9
     '*** YOUR CODE HERE ***'
+    if times_called is None:
+        return max(range(1, 11), key=lambda num_rolls: expected_value(roll_dice_distribution(num_rolls, dice)))
     return max(
         range(1, 11),
         key=lambda num_rolls: make_averaged(roll_dice, times_called)(num_rolls, dice),
@@ -321,19 +349,40 @@ def average_win_rate(
     return (win_rate_as_player_0 + win_rate_as_player_1) / 2
 
 
-def run_experiments():
-    """Run a series of strategy experiments and report results."""
-    six_sided_max = max_scoring_num_rolls(six_sided)
+def run_experiments(exact: bool = True):
+    """Run a series of strategy experiments and report results. Win rates are
+    computed exactly (see solver.py) unless EXACT is false, in which case they
+    are sampled.
+    """
+    if exact:
+        from solver import exact_average_win_rate as win_rate
+    else:
+        from parallel import parallel_average_win_rate as win_rate
+
+    six_sided_max = max_scoring_num_rolls(six_sided, times_called=None)
     print('Max scoring num rolls for six-sided dice:', six_sided_max)
 
-    print('always_roll(6) win rate:', average_win_rate(always_roll(6)))  # near 0.5
-    print('catch_up win rate:', average_win_rate(catch_up))
-    print('always_roll(3) win rate:', average_win_rate(always_roll(3)))
-    print('always_roll(8) win rate:', average_win_rate(always_roll(8)))
+    print('always_roll(6) win rate:', win_rate(always_roll(6)))  # near 0.5
+    print('catch_up win rate:', win_rate(catch_up))
+    print('always_roll(3) win rate:', win_rate(always_roll(3)))
+    print('always_roll(8) win rate:', win_rate(always_roll(8)))
+
+    print('boar_strategy win rate:', win_rate(boar_strategy))
+    print('sus_strategy win rate:', win_rate(sus_strategy))
+    print('final_strategy win rate:', win_rate(final_strategy))
+
+    # Paired games on common dice need several times fewer games per comparison.
+    from crn import compare_strategies
+
+    for name, strategy, other in [('sus_strategy - boar_strategy', sus_strategy, boar_strategy), ('final_strategy - sus_strategy', final_strategy, sus_strategy)]:
+        difference, error = compare_strategies(strategy, other, num_games=250)
+        print(f'{name} win rate: {difference:+.4f} (standard error {error:.4f})')
+
+    # Where the time of a simulation goes, stage by stage.
+    from instrument import profile_games
 
-    print('boar_strategy win rate:', average_win_rate(boar_strategy))
-    print('sus_strategy win rate:', average_win_rate(sus_strategy))
-    print('final_strategy win rate:', average_win_rate(final_strategy))
+    print('final_strategy profile against always_roll(6):')
+    print(profile_games(final_strategy, num_games=500))
     '*** You may add additional experiments as you wish ***'
 
 
@@ -369,27 +418,29 @@ def sus_strategy(
     # END PROBLEM 11
 
 
+_final_strategies: dict[tuple[int, int], Callable[[int, int], int]] = {}  # Compiled by planner.py
+
+
 def final_strategy(
     score: int,
     opponent_score: int,
     threshold: int = 11,
     num_rolls: int = 6,
 ) -> int:
-    """Write a brief description of your final strategy.
-
-    *** YOUR DESCRIPTION HERE ***
+    """Roll 0 dice when Boar Brawl reaches GOAL or gains at least THRESHOLD
+    points. Otherwise roll the fewest dice (below NUM_ROLLS) whose expected
+    score under Sus Fuss reaches GOAL, and NUM_ROLLS dice if there are none.
     """
     # BEGIN PROBLEM 12
     '*** YOUR CODE HERE ***'
-    new_score: int = sus_points(score + boar_brawl(score, opponent_score))
-    if new_score >= GOAL or new_score >= (score + threshold):
-        return 0
-    return bisect_left(
-        range(num_rolls),
-        GOAL,
-        1,
-        key=lambda i: sus_update(i, score, opponent_score),
-    )
+    # The choices for every state are looked up in a table compiled from the
+    # expected scores of each number of dice (see planner.py).
+    strategy = _final_strategies.get((threshold, num_rolls))
+    if strategy is None:
+        from planner import final_plan_strategy
+
+        strategy = _final_strategies[threshold, num_rolls] = final_plan_strategy(threshold, num_rolls)
+    return strategy(score, opponent_score)
     # END PROBLEM 12
 
 
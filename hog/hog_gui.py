@@ -3,6 +3,9 @@
 import io
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
 from contextlib import redirect_stdout
 
 import default_graphics
@@ -16,6 +19,12 @@ DEFAULT_SERVER = 'https://hog.cs61a.org'
 GUI_FOLDER = 'gui_files/'
 PATHS = {}
 
+SESSION_TIMEOUT = 30 * 60  # Seconds a game stays cached without a request.
+MAX_SESSIONS = 1000
+
+_sessions = OrderedDict()  # Cached games by GameSession.key, least recently used first.
+_sessions_lock = threading.Lock()
+
 
 class HogLoggingException(Exception):
     pass
@@ -23,67 +32,130 @@ class HogLoggingException(Exception):
 
 @route
 def take_turn(prev_rolls, move_history, goal, game_rules):
-    """Simulate the whole game up to the current turn."""
-    fair_dice = dice.make_fair_dice(6)
-    dice_results = []
-
+    """Simulate the game up to the current turn.
+
+    Unfinished games are cached under their goal, rules, rolls and moves, so a
+    request that adds one move to the game of the previous request only plays
+    that move. Any other request replays the whole game.
+
+    >>> rules = {'Sus Fuss': True}
+    >>> first = take_turn([], [3], 100, rules)
+    >>> game = next(reversed(_sessions.values()))
+    >>> second = take_turn(first['rolls'], [3, 4], 100, rules)
+    >>> next(reversed(_sessions.values())) is game, game.moves, len(game.rolls)
+    (True, [3, 4], 7)
+    """
     sus_fuss = game_rules['Sus Fuss']
-
-    def logged_dice():
-        if len(dice_results) < len(prev_rolls):
-            out = prev_rolls[len(dice_results)]
-        else:
-            out = fair_dice()
-        dice_results.append(out)
-        return out
-
-    final_scores = None
-    who = 0
-
-    move_cnt = 0
-
-    def strategy_for(player):
-        def strategy(*scores):
-            nonlocal final_scores, move_cnt, who
-            final_scores = scores
-            if player:
-                final_scores = final_scores[::-1]
-            who = player
-            if move_cnt == len(move_history):
-                raise HogLoggingException()
-            move = move_history[move_cnt]
-            move_cnt += 1
-            return move
-
-        return strategy
-
-    game_over = False
-
-    try:
-        final_scores = trace_play(
-            hog.play,
-            strategy_for(0),
-            strategy_for(1),
-            hog.sus_update if sus_fuss else hog.simple_update,
-            0,
-            0,
-            dice=logged_dice,
-            goal=goal,
-        )[:2]
-    except HogLoggingException:
-        pass
-    else:
-        game_over = True
+    game = _checkout_session(goal, sus_fuss, prev_rolls, move_history) or GameSession(goal, sus_fuss)
+    game.advance(prev_rolls, move_history)
+    if not game.game_over:
+        _checkin_session(game)
 
     return {
-        'rolls': dice_results,
-        'finalScores': final_scores,
+        'rolls': list(game.rolls),
+        'finalScores': game.scores,
         'message': '',
-        'gameOver': game_over,
-        'who': who,
+        'gameOver': game.game_over,
+        'who': game.who,
     }
 
 
+class GameSession:
+    """The state of a game after the moves and rolls played so far."""
+
+    def __init__(self, goal, sus_fuss):
+        self.goal = goal
+        self.sus_fuss = sus_fuss
+        self.moves = []
+        self.rolls = []
+        self.scores = (0, 0)
+        self.who = 0
+        self.game_over = False
+        self.trace = []
+        self.last_used = time.monotonic()
+
+    def key(self):
+        """Return the key of this game in the cache."""
+        return (self.goal, self.sus_fuss, tuple(self.rolls), tuple(self.moves))
+
+    def advance(self, prev_rolls, move_history):
+        """Play the moves of MOVE_HISTORY not yet played, using the rolls of
+        PREV_ROLLS not yet used before rolling fresh dice.
+        """
+        fair_dice = dice.make_buffered_dice(6)
+        first_turn = len(self.trace)
+        swapped = self.who == 1
+
+        def logged_dice():
+            if len(self.rolls) < len(prev_rolls):
+                out = prev_rolls[len(self.rolls)]
+            else:
+                out = fair_dice()
+            self.rolls.append(out)
+            return out
+
+        def strategy_for(player):
+            def strategy(*scores):
+                self.scores = scores[::-1] if player else scores
+                self.who = player
+                if len(self.moves) == len(move_history):
+                    raise HogLoggingException()
+                move = move_history[len(self.moves)]
+                self.moves.append(move)
+                return move
+
+            return strategy
+
+        # play always starts with player 0, so the players trade seats when
+        # the game resumes on player 1's turn.
+        players = (strategy_for(1), strategy_for(0)) if swapped else (strategy_for(0), strategy_for(1))
+        scores = self.scores[::-1] if swapped else self.scores
+        try:
+            final_scores = trace_play(
+                hog.play,
+                *players,
+                hog.sus_update if self.sus_fuss else hog.simple_update,
+                *scores,
+                dice=logged_dice,
+                goal=self.goal,
+                game_trace=self.trace,
+            )[:2]
+        except HogLoggingException:
+            pass
+        else:
+            self.scores = final_scores[::-1] if swapped else final_scores
+            self.game_over = True
+        if swapped:
+            for turn in self.trace[first_turn:]:
+                turn['s0_start'], turn['s1_start'] = turn['s1_start'], turn['s0_start']
+                turn['who'] = 1 - turn['who']
+
+
+def _checkout_session(goal, sus_fuss, prev_rolls, move_history):
+    """Remove and return the cached game that has rolled exactly PREV_ROLLS and
+    played all of MOVE_HISTORY but its last move, as the game of the previous
+    request does, or all of it, as for a repeated request. Return None if there
+    is none, evicting idle games.
+    """
+    with _sessions_lock:
+        now = time.monotonic()
+        while _sessions:
+            oldest = next(iter(_sessions.values()))
+            if now - oldest.last_used < SESSION_TIMEOUT and len(_sessions) < MAX_SESSIONS:
+                break
+            _sessions.popitem(last=False)
+        rolls, moves = tuple(prev_rolls), tuple(move_history)
+        game = _sessions.pop((goal, sus_fuss, rolls, moves[:-1]), None) if moves else None
+        return game or _sessions.pop((goal, sus_fuss, rolls, moves), None)
+
+
+def _checkin_session(game):
+    """Cache GAME as the most recently used game."""
+    game.last_used = time.monotonic()
+    with _sessions_lock:
+        _sessions[game.key()] = game
+
+
 @route
 def strategy(name, scores):
     STRATEGIES = {
@@ -104,20 +176,23 @@ def draw_dice_graphic(num):
     return default_graphics.dice[num]
 
 
-def trace_play(play, strategy0, strategy1, update, score0, score1, dice, goal):
+def trace_play(play, strategy0, strategy1, update, score0, score1, dice, goal, game_trace=None):
     """Wraps the user's play function and
         (1) ensures that strategy0 and strategy1 are called exactly once per turn
         (2) records the entire game, returning the result as a list of dictionaries,
             each with keys "s0_start", "s1_start", "who", "num_dice", "dice_values"
     Returns (s0, s1, trace) where s0, s1 are the return values from play and trace
-        is the trace as specified above.
+        is the trace as specified above. If GAME_TRACE is given, turns are appended
+        to it as they are played, so the trace is kept even if play raises.
     This might seem a bit overcomplicated but it will also used to create the game
         traces for the fuzz test (when run against the staff solution).
     """
-    game_trace = []
+    if game_trace is None:
+        game_trace = []
+    first_turn = len(game_trace)
 
     def mod_strategy(who, my_score, opponent_score):
-        if game_trace:
+        if len(game_trace) > first_turn:
             prev_total_score = game_trace[-1]['s0_start'] + game_trace[-1]['s1_start']
             if prev_total_score == my_score + opponent_score:
                 # game is still on last turn since the total number of points
@@ -136,7 +211,7 @@ def trace_play(play, strategy0, strategy1, update, score0, score1, dice, goal):
 
     def mod_dice():
         roll = dice()
-        if not game_trace:
+        if len(game_trace) == first_turn:
             raise RuntimeError('roll_dice called before either strategy function')
         game_trace[-1]['dice_values'].append(roll)
         return roll
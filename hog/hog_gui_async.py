@@ -0,0 +1,177 @@
+"""Asynchronous web server for the hog GUI.
+
+Serves the routes of hog_gui from an asyncio event loop instead of the
+synchronous common server, so that one slow request doesn't hold up the rest:
+
+- take_turn runs in a pool of worker processes. Each game's requests go to the
+  same worker, chosen by the dice of its first turn that rolled any, so that
+  the game cached there is continued (see hog_gui.take_turn). Only the
+  request that first rolls those dice may go to another worker.
+- strategy runs in a thread pool.
+- dice_graphic.svg is rendered once per die and served with caching headers.
+- Static files are served from GUI_FOLDER.
+
+Connections are kept alive between requests, as HTTP/1.1 allows.
+
+    python3 hog_gui_async.py [--port PORT] [--workers N]
+"""
+
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import hog_gui
+from gui_files.common_server import snakify
+
+IDLE_TIMEOUT = 60  # Seconds a kept-alive connection may wait for a request.
+MAX_BODY = 1 << 20  # The largest request body accepted, in bytes.
+CACHE_CONTROL = 'public, max-age=86400'
+
+STATUS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+def render_dice() -> dict[str, tuple[bytes, str]]:
+    """Return the body and ETag of the dice graphic for each face."""
+    graphics = {}
+    for num in range(1, 7):
+        body = hog_gui.draw_dice_graphic([str(num)]).encode()
+        graphics[str(num)] = (body, '"' + hashlib.sha256(body).hexdigest()[:16] + '"')
+    return graphics
+
+
+def route_key(prev_rolls, move_history, goal, game_rules) -> bytes:
+    """Return a key for a take_turn request that stays the same for the rest
+    of its game once the game's first turn that rolls dice has rolled them.
+
+    >>> rules = {'Sus Fuss': True}
+    >>> route_key([], [0, 3], 100, rules) == route_key([4, 2, 6], [0, 3, 5], 100, rules)
+    False
+    >>> route_key([4, 2, 6], [0, 3, 5], 100, rules) == route_key([4, 2, 6, 1, 1, 5, 3, 2], [0, 3, 5, 2], 100, rules)
+    True
+    """
+    first = next((num_rolls for num_rolls in move_history if num_rolls), 0)
+    return json.dumps([goal, game_rules, prev_rolls[:first]], sort_keys=True).encode()
+
+
+class HogServer:
+    """Serves the hog GUI with WORKERS worker processes for take_turn."""
+
+    def __init__(self, workers: int | None = None, gui_folder: str = hog_gui.GUI_FOLDER):
+        workers = workers or os.cpu_count() or 1
+        self.turn_workers = [ProcessPoolExecutor(1) for _ in range(workers)]
+        self.threads = ThreadPoolExecutor()
+        self.gui_folder = os.path.abspath(gui_folder)
+        self.dice = render_dice()
+
+    def close(self) -> None:
+        for executor in self.turn_workers:
+            executor.shutdown(cancel_futures=True)
+        self.threads.shutdown(cancel_futures=True)
+
+    async def take_turn(self, prev_rolls, move_history, goal, game_rules):
+        worker = self.turn_workers[int(hashlib.sha256(route_key(prev_rolls, move_history, goal, game_rules)).hexdigest(), 16) % len(self.turn_workers)]
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(worker, hog_gui.take_turn, prev_rolls, move_history, goal, game_rules)
+
+    async def strategy(self, name, scores):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.threads, hog_gui.strategy, name, scores)
+
+    async def handle(self, method: str, target: str, headers: dict[str, str], body: bytes) -> tuple[int, dict[str, str], bytes]:
+        """Return the (status, headers, body) of the response to a request."""
+        url = urlsplit(target)
+        path = url.path.strip('/')
+        if path in ('take_turn', 'strategy'):
+            if method != 'POST':
+                return 405, {}, b''
+            try:
+                kwargs = snakify(json.loads(body or b'{}'))
+                result = await getattr(self, path)(**kwargs)
+            except (TypeError, ValueError, KeyError):
+                return 400, {}, b''
+            return 200, {'Content-Type': 'application/json'}, json.dumps(result).encode()
+        if path == 'dice_graphic.svg':
+            num = parse_qs(url.query).get('num', [''])[0]
+            if num not in self.dice:
+                return 404, {}, b''
+            graphic, etag = self.dice[num]
+            cache = {'ETag': etag, 'Cache-Control': CACHE_CONTROL}
+            if headers.get('if-none-match') == etag:
+                return 304, cache, b''
+            return 200, {'Content-Type': 'image/svg+xml', **cache}, graphic
+        if method != 'GET':
+            return 405, {}, b''
+        return await asyncio.get_running_loop().run_in_executor(self.threads, self.static_file, path or 'index.html')
+
+    def static_file(self, path: str) -> tuple[int, dict[str, str], bytes]:
+        full_path = os.path.abspath(os.path.join(self.gui_folder, path))
+        if not full_path.startswith(self.gui_folder + os.sep) or not os.path.isfile(full_path):
+            return 404, {}, b''
+        with open(full_path, 'rb') as f:
+            content = f.read()
+        return 200, {'Content-Type': mimetypes.guess_type(full_path)[0] or 'application/octet-stream'}, content
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer the requests sent over a connection until it closes."""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                except TimeoutError:
+                    break
+                if not request_line:
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY:
+                    status, response_headers, body = 413, {}, b''
+                else:
+                    body = await reader.readexactly(length)
+                    try:
+                        status, response_headers, body = await self.handle(method, target, headers, body)
+                    except Exception:
+                        status, response_headers, body = 500, {}, b''
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close' and status != 413
+                head = [f'HTTP/1.1 {status} {STATUS[status]}', f'Content-Length: {len(body)}', f'Connection: {"keep-alive" if keep_alive else "close"}']
+                head += [f'{name}: {value}' for name, value in response_headers.items()]
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, ConnectionError, asyncio.IncompleteReadError):
+            pass  # A malformed request or a dropped connection ends it.
+        finally:
+            writer.close()
+
+
+async def serve(port: int = hog_gui.PORT, workers: int | None = None) -> None:
+    """Serve the hog GUI on PORT until cancelled."""
+    hog_server = HogServer(workers)
+    server = await asyncio.start_server(hog_server.serve_connection, 'localhost', port)
+    print(f'Serving the hog GUI at http://localhost:{port}')
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        hog_server.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve the hog GUI asynchronously')
+    parser.add_argument('--port', type=int, default=hog_gui.PORT, help='Port to serve on')
+    parser.add_argument('--workers', type=int, default=None, help='Processes for take_turn (one per core by default)')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
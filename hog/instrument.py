@@ -0,0 +1,134 @@
+"""Opt-in instrumentation for simulated games.
+
+instrumented_play returns a replacement for play that counts and times each
+stage of every game it plays into a PlayProfile: the strategies, the update
+function, Sus Fuss and the dice. play and the update functions themselves are
+unchanged, so games played without it cost nothing extra.
+
+Times are measured around each call, so they include some of the cost of
+measuring them.
+"""
+
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from time import perf_counter
+
+from dice import six_sided
+
+from hog import GOAL, always_roll, play, simple_update, sus_points, sus_update
+
+STAGES = ('strategy', 'update', 'sus_fuss', 'dice')
+
+
+@dataclass
+class PlayProfile:
+    """Counts and cumulative times (in seconds) of the games played by an
+    instrumented play. The update time excludes the dice and Sus Fuss.
+    """
+
+    games: int = 0
+    turns: int = 0
+    strategy_calls: int = 0
+    dice_rolled: int = 0
+    boar_brawls: int = 0
+    sus_fuss_triggers: int = 0
+    strategy_time: float = 0.0
+    update_time: float = 0.0
+    sus_fuss_time: float = 0.0
+    dice_time: float = 0.0
+    total_time: float = 0.0
+
+    def report(self) -> dict:
+        """Return the counts, the times and the share of the total time of
+        each stage, as a dictionary.
+
+        >>> profile = profile_games(always_roll(0), num_games=5)
+        >>> report = profile.report()
+        >>> report['games'], report['dice_rolled'] > 0, report['boar_brawls'] == report['turns'] - report['dice_rolled'] // 6
+        (10, True, True)
+        """
+        report = asdict(self)
+        report['shares'] = {stage: getattr(self, stage + '_time') / self.total_time if self.total_time else 0.0 for stage in STAGES}
+        return report
+
+    def __str__(self) -> str:
+        lines = [f'{self.games} games, {self.turns} turns, {self.strategy_calls} strategy calls, {self.dice_rolled} dice rolled']
+        lines.append(f'Boar Brawl on {self.boar_brawls / max(self.turns, 1):.1%} of turns, Sus Fuss on {self.sus_fuss_triggers / max(self.turns, 1):.1%}')
+        shares = self.report()['shares']
+        for stage in STAGES:
+            lines.append(f'{stage:>10}: {getattr(self, stage + "_time"):.4f}s ({shares[stage]:.1%})')
+        lines.append(f'{"total":>10}: {self.total_time:.4f}s')
+        return '\n'.join(lines)
+
+
+def instrumented_play(profile: PlayProfile, play: Callable[..., tuple[int, int]] = play) -> Callable[..., tuple[int, int]]:
+    """Return a function that plays games like PLAY and adds their counts and
+    times to PROFILE.
+
+    >>> profile = PlayProfile()
+    >>> from dice import make_test_dice
+    >>> instrumented_play(profile)(always_roll(1), always_roll(0), sus_update, dice=make_test_dice(4), goal=9)
+    (11, 1)
+    >>> profile.turns, profile.dice_rolled, profile.boar_brawls, profile.sus_fuss_triggers
+    (3, 2, 1, 2)
+    """
+
+    def timed_strategy(strategy):
+        def timed(score, opponent_score):
+            start = perf_counter()
+            num_rolls = strategy(score, opponent_score)
+            profile.strategy_time += perf_counter() - start
+            profile.strategy_calls += 1
+            return num_rolls
+
+        return timed
+
+    def timed_play(strategy0, strategy1, update, score0=0, score1=0, dice=six_sided, goal=GOAL):
+        def timed_dice():
+            start = perf_counter()
+            outcome = dice()
+            profile.dice_time += perf_counter() - start
+            profile.dice_rolled += 1
+            return outcome
+
+        def timed_update(num_rolls, player_score, opponent_score, dice):
+            profile.turns += 1
+            profile.boar_brawls += num_rolls == 0
+            dice_time = profile.dice_time
+            start = perf_counter()
+            if update is sus_update:
+                # sus_update is simple_update followed by Sus Fuss, timed apart.
+                score = simple_update(num_rolls, player_score, opponent_score, dice)
+                middle = perf_counter()
+                new_score = sus_points(score)
+                profile.sus_fuss_time += perf_counter() - middle
+                profile.sus_fuss_triggers += new_score != score
+            else:
+                new_score = update(num_rolls, player_score, opponent_score, dice)
+                middle = perf_counter()
+            profile.update_time += middle - start - (profile.dice_time - dice_time)
+            return new_score
+
+        start = perf_counter()
+        scores = play(timed_strategy(strategy0), timed_strategy(strategy1), timed_update, score0, score1, dice=timed_dice, goal=goal)
+        profile.total_time += perf_counter() - start
+        profile.games += 1
+        return scores
+
+    return timed_play
+
+
+def profile_games(
+    strategy: Callable[[int, int], int],
+    baseline: Callable[[int, int], int] = always_roll(6),
+    num_games: int = 1000,
+    update: Callable[[int, int, int, Callable[[], int]], int] = sus_update,
+) -> PlayProfile:
+    """Return the profile of NUM_GAMES games of STRATEGY against BASELINE in
+    each seating."""
+    profile = PlayProfile()
+    timed_play = instrumented_play(profile)
+    for _ in range(num_games):
+        timed_play(strategy, baseline, update)
+        timed_play(baseline, strategy, update)
+    return profile
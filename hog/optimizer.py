@@ -0,0 +1,223 @@
+"""Search for strong roll tables by hill climbing.
+
+A candidate strategy is a roll table (see batch.py), scored by its exact win
+rate against a baseline strategy (see solver.py). The search starts from the
+table of final_strategy and runs in two stages:
+
+1. Hill climbing. Each round, every worker scores random mutations of the best
+   table, which reset or shift a rectangle of entries, and the best mutation
+   is kept if it improves on the best table.
+2. Local search. Each sweep, the workers try every entry one die up and one
+   die down. The improving changes are applied together if that beats the
+   single best change, and the search stops when no entry improves. Changing
+   one entry moves the win rate by as little as 1e-8, below the rounding error
+   of the float32 solver, so local search scores tables with float64.
+
+Progress is saved to a checkpoint after every round or sweep, and a search
+started with an existing checkpoint of the same goal and baseline resumes
+from it. The best table can be exported as a Python module defining a
+compiled strategy.
+"""
+
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from batch import MAX_ROLLS, roll_table
+from solver import exact_win_rate
+from ucb import main
+
+from hog import GOAL, always_roll, final_strategy
+
+MAX_MUTATION_SIZE = 8  # The largest side of a mutated rectangle.
+CHECKPOINT = 'optimizer.npz'
+
+
+def mutate(table: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Return a copy of TABLE in which a random rectangle of entries is set to
+    a random number of dice or shifted by one die.
+
+    >>> table = roll_table(always_roll(6))
+    >>> mutated = mutate(table, np.random.default_rng(61))
+    >>> bool((mutated != table).any()), bool(((0 <= mutated) & (mutated <= 10)).all())
+    (True, True)
+    """
+    goal = len(table)
+    height, width = rng.integers(1, MAX_MUTATION_SIZE + 1, size=2)
+    row, column = rng.integers(0, goal - height + 1), rng.integers(0, goal - width + 1)
+    mutated = table.copy()
+    cells = mutated[row : row + height, column : column + width]
+    if rng.random() < 0.5:
+        cells[...] = rng.integers(0, MAX_ROLLS + 1)
+    else:
+        cells[...] = np.clip(cells + rng.choice((-1, 1)), 0, MAX_ROLLS)
+    return mutated
+
+
+def best_mutation(table: np.ndarray, baseline: np.ndarray, seed: np.random.SeedSequence, count: int) -> tuple[float, np.ndarray]:
+    """Return (score, mutation) for the best of COUNT random mutations of
+    TABLE against BASELINE."""
+    rng = np.random.default_rng(seed)
+    mutations = [mutate(table, rng) for _ in range(count)]
+    scores = [exact_win_rate(mutation, baseline, len(table)) for mutation in mutations]
+    best = int(np.argmax(scores))
+    return scores[best], mutations[best]
+
+
+def cell_changes(table: np.ndarray, baseline: np.ndarray, cells: list[tuple[int, int]], score: float) -> list[tuple[float, int, int, int]]:
+    """Return (gain, score, opponent_score, num_rolls) for the best improving
+    change of one die at each of CELLS of TABLE, whose own score is SCORE,
+    scored with float64."""
+    changes = []
+    for cell in cells:
+        best = (0.0, 0)
+        for num_rolls in (table[cell] - 1, table[cell] + 1):
+            if 0 <= num_rolls <= MAX_ROLLS:
+                changed = table.copy()
+                changed[cell] = num_rolls
+                best = max(best, (exact_win_rate(changed, baseline, len(table), dtype=np.float64) - score, int(num_rolls)))
+        if best[0] > 0:
+            changes.append((best[0], *cell, best[1]))
+    return changes
+
+
+def fingerprint(table: np.ndarray) -> str:
+    """Return a fingerprint of the entries of roll table TABLE.
+
+    >>> fingerprint(roll_table(always_roll(6))) == fingerprint(roll_table(always_roll(6)))
+    True
+    >>> fingerprint(roll_table(always_roll(6))) == fingerprint(roll_table(always_roll(5)))
+    False
+    """
+    return hashlib.sha256(np.asarray(table, dtype=np.int8).tobytes()).hexdigest()
+
+
+def save_checkpoint(path: str, table: np.ndarray, score: float, stage: int, step: int, baseline: np.ndarray) -> None:
+    """Save TABLE, its SCORE against BASELINE and the number of the next STEP
+    of STAGE to PATH."""
+    temporary = path + '.tmp.npz'
+    np.savez(temporary, table=table, score=score, stage=stage, step=step, goal=len(table), baseline=fingerprint(baseline))
+    os.replace(temporary, path)  # A search interrupted while saving keeps the old checkpoint.
+
+
+def load_checkpoint(path: str, baseline: np.ndarray) -> tuple[np.ndarray, float, int, int]:
+    """Return (table, score, stage, step) saved to PATH by save_checkpoint.
+    Raise a ValueError if it was saved by a search against another BASELINE
+    or for another goal.
+    """
+    with np.load(path) as checkpoint:
+        if int(checkpoint['goal']) != len(baseline) or str(checkpoint['baseline']) != fingerprint(baseline):
+            raise ValueError(f'{path} was saved by a search with another baseline or goal; remove it to start over')
+        return checkpoint['table'], float(checkpoint['score']), int(checkpoint['stage']), int(checkpoint['step'])
+
+
+def optimize(
+    table: np.ndarray | None = None,
+    baseline: np.ndarray | None = None,
+    rounds: int = 100,
+    mutations: int = 8,
+    sweeps: int = 10,
+    seed: int | None = None,
+    workers: int | None = None,
+    checkpoint: str | None = CHECKPOINT,
+    log=print,
+) -> tuple[np.ndarray, float]:
+    """Return (table, score) for the best roll table found by searching from
+    TABLE (final_strategy's by default) against BASELINE (always_roll(6) by
+    default). Each of ROUNDS rounds of hill climbing scores MUTATIONS mutations
+    per worker, followed by up to SWEEPS sweeps of local search.
+
+    The search resumes from CHECKPOINT if it exists, and saves it as it goes.
+    A checkpoint saved by a search against another baseline or for another
+    goal is rejected with a ValueError.
+    """
+    if baseline is None:
+        baseline = roll_table(always_roll(6))
+    goal = len(baseline)
+    if checkpoint and os.path.exists(checkpoint):
+        table, score, stage, step = load_checkpoint(checkpoint, baseline)
+        log(f'Resumed at stage {stage}, step {step} with win rate {score:.6f}')
+    else:
+        if table is None:
+            table = roll_table(final_strategy, goal)
+        table = np.array(table, dtype=np.int8)
+        score, stage, step = exact_win_rate(table, baseline, goal), 1, 0
+    workers = workers or os.cpu_count() or 1
+    # Each round draws its mutations from its own seed, so a search with a
+    # given SEED makes the same mutations whether or not it was resumed.
+    seeds = np.random.SeedSequence(seed).spawn(rounds)
+    if stage == 1 and step >= rounds:
+        stage, step = 2, 0
+    with ProcessPoolExecutor(workers) as executor:
+        while stage == 1 and step < rounds:
+            start = time.perf_counter()
+            results = executor.map(best_mutation, [table] * workers, [baseline] * workers, seeds[step].spawn(workers), [mutations] * workers)
+            best_score, best_table = max(results, key=lambda result: result[0])
+            if best_score > score:
+                table, score = best_table, best_score
+            log(f'Round {step + 1}: win rate {score:.6f} ({time.perf_counter() - start:.1f}s)')
+            step += 1
+            if step == rounds:
+                stage, step = 2, 0
+            if checkpoint:
+                save_checkpoint(checkpoint, table, score, stage, step, baseline)
+        if stage == 2:
+            score = exact_win_rate(table, baseline, goal, dtype=np.float64)
+        while stage == 2 and step < sweeps:
+            start = time.perf_counter()
+            cells = [(s, o) for s in range(goal) for o in range(goal)]
+            chunks = [cells[i::workers] for i in range(workers)]
+            changes = [change for chunk in executor.map(cell_changes, [table] * workers, [baseline] * workers, chunks, [score] * workers) for change in chunk]
+            if not changes:
+                stage = 3
+            else:
+                best_gain, *cell, num_rolls = max(changes)
+                combined = table.copy()
+                for _, s, o, n in changes:
+                    combined[s, o] = n
+                combined_score = exact_win_rate(combined, baseline, goal, dtype=np.float64)
+                if combined_score > score + best_gain:
+                    table, score = combined, combined_score
+                else:
+                    table = table.copy()
+                    table[tuple(cell)] = num_rolls
+                    score = exact_win_rate(table, baseline, goal, dtype=np.float64)
+            log(f'Sweep {step + 1}: {len(changes)} improving changes, win rate {score:.6f} ({time.perf_counter() - start:.1f}s)')
+            step += 1
+            if checkpoint:
+                save_checkpoint(checkpoint, table, score, stage, step, baseline)
+    return table, score
+
+
+def export_strategy(table: np.ndarray, path: str, name: str = 'optimized_strategy', score: float | None = None) -> None:
+    """Write a Python module to PATH that defines the compiled strategy NAME
+    with roll table TABLE, so that hog.py can import it."""
+    table = np.asarray(table, dtype=np.int8)
+    rows = ''.join(f"    '{row.tobytes().hex()}'\n" for row in table)
+    summary = f' (exact win rate {score:.6f} against always_roll(6))' if score is not None else ''
+    with open(path, 'w') as f:
+        f.write(f'"""Roll table found by optimizer.py{summary}."""\n\n')
+        f.write('from compiled import table_strategy\n\n')
+        f.write(f'TABLE = bytes.fromhex(\n{rows})\n\n')
+        f.write(f'{name} = table_strategy(TABLE, {len(table)})\n')
+
+
+@main
+def run(*args):
+    """Search for a strong roll table and export it as a strategy."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Optimize a Hog roll table')
+    parser.add_argument('--rounds', type=int, default=100, help='Rounds of hill climbing')
+    parser.add_argument('--sweeps', type=int, default=10, help='Sweeps of local search')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (one per core by default)')
+    parser.add_argument('--seed', type=int, default=None, help='Seed of the random mutations')
+    parser.add_argument('--checkpoint', default=CHECKPOINT, help='Checkpoint to resume from and save to')
+    parser.add_argument('--output', default='optimized_strategy.py', help='Module to export the best table to')
+    args = parser.parse_args()
+
+    table, score = optimize(rounds=args.rounds, sweeps=args.sweeps, seed=args.seed, workers=args.workers, checkpoint=args.checkpoint)
+    export_strategy(table, args.output, score=score)
+    print(f'Exported a strategy with win rate {score:.6f} (final_strategy: {exact_win_rate(roll_table(final_strategy)):.6f}) to {args.output}')
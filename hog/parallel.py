@@ -0,0 +1,74 @@
+"""Win rate estimation spread across a pool of processes.
+
+Games are split into fixed-size chunks, and each chunk rolls its own die
+seeded from the overall seed, its seating and its position. The estimate for a
+seed is therefore the same no matter how many workers play the chunks.
+"""
+
+import multiprocessing
+import os
+import secrets
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+
+from dice import make_buffered_dice
+
+from hog import always_roll, play, sus_update
+
+CHUNK_SIZE = 50  # The number of games played with one seeded die.
+
+_strategies: tuple[Callable[[int, int], int], Callable[[int, int], int]] | None = None
+
+
+def _set_strategies(strategy: Callable[[int, int], int], baseline: Callable[[int, int], int]) -> None:
+    global _strategies
+    _strategies = (strategy, baseline)
+
+
+def _count_wins(seating: int, seed: str, num_games: int) -> int:
+    """Return how many of NUM_GAMES games the strategy wins when it is player
+    SEATING, rolling a die seeded with SEED."""
+    strategy, baseline = _strategies
+    dice = make_buffered_dice(6, seed)
+    wins = 0
+    for _ in range(num_games):
+        if seating == 0:
+            score0, score1 = play(strategy, baseline, sus_update, dice=dice)
+            wins += score0 > score1
+        else:
+            score0, score1 = play(baseline, strategy, sus_update, dice=dice)
+            wins += score0 <= score1
+    return wins
+
+
+def parallel_average_win_rate(
+    strategy: Callable[[int, int], int],
+    baseline: Callable[[int, int], int] = always_roll(6),
+    num_games: int = 1000,
+    seed: int | None = None,
+    workers: int | None = None,
+) -> float:
+    """Return the average win rate of STRATEGY against BASELINE over NUM_GAMES
+    games as player 0 and NUM_GAMES games as player 1, like average_win_rate.
+
+    The games are played by WORKERS processes (one per core by default). The
+    same SEED always gives the same win rate.
+
+    >>> rate = parallel_average_win_rate(always_roll(4), num_games=200, seed=61, workers=1)
+    >>> rate == parallel_average_win_rate(always_roll(4), num_games=200, seed=61, workers=2)
+    True
+    """
+    if seed is None:
+        seed = secrets.randbits(64)
+    tasks = [(seating, f'{seed}:{seating}:{start}', min(CHUNK_SIZE, num_games - start)) for seating in (0, 1) for start in range(0, num_games, CHUNK_SIZE)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _set_strategies(strategy, baseline)
+        wins = sum(_count_wins(*task) for task in tasks)
+    else:
+        # Forked workers inherit the strategies, which need not be picklable.
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        with ProcessPoolExecutor(workers, context, initializer=_set_strategies, initargs=(strategy, baseline)) as executor:
+            wins = sum(executor.map(_count_wins, *zip(*tasks)))
+    return wins / (2 * num_games)
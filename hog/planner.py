@@ -0,0 +1,118 @@
+"""Turn planning tables for Hog with Sus Fuss and fair six-sided dice.
+
+For every state (score, opponent_score) below a goal and every number of dice
+from 0 to 10, the plan of that goal holds the expected score of the current
+player after a turn under sus_update, and the probability that the turn
+reaches the goal. Plans are computed once per goal and stored as flat
+array('d') tables, so looking up a state costs a single index.
+
+final_strategy is compiled from the plan into a roll table.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Callable
+from functools import cache
+
+import compiled
+from dice import six_sided
+from distributions import roll_dice_distribution
+
+from hog import GOAL, boar_brawl, sus_points
+
+MAX_ROLLS = 10  # A player may roll at most 10 dice on a turn.
+
+
+def plan_index(num_rolls: int, score: int, opponent_score: int, goal: int = GOAL) -> int:
+    """Return the index of rolling NUM_ROLLS dice from state (SCORE,
+    OPPONENT_SCORE) in the tables of the plan for GOAL."""
+    return (score * goal + opponent_score) * (MAX_ROLLS + 1) + num_rolls
+
+
+@cache
+def _roll_outcomes(num_rolls: int, score: int) -> tuple[tuple[int, float], ...]:
+    """Return the distribution of the score after rolling NUM_ROLLS > 0 dice
+    from SCORE under Sus Fuss, as (new_score, probability) pairs."""
+    outcomes: dict[int, float] = {}
+    for points, p in roll_dice_distribution(num_rolls, six_sided).items():
+        new_score = sus_points(score + points)
+        outcomes[new_score] = outcomes.get(new_score, 0) + float(p)
+    return tuple(sorted(outcomes.items()))
+
+
+@cache
+def plan(goal: int = GOAL) -> tuple[array, array]:
+    """Return (expected, reach) for GOAL, where expected[i] is the expected
+    score after the turn and reach[i] the probability of reaching GOAL on the
+    turn, for i = plan_index(num_rolls, score, opponent_score, GOAL).
+
+    >>> expected, reach = plan()
+    >>> expected[plan_index(0, 21, 46)], reach[plan_index(0, 95, 0)]
+    (30.0, 1.0)
+    >>> round(expected[plan_index(6, 0, 0)], 4), round(reach[plan_index(6, 90, 0)], 4)
+    (9.0933, 0.3349)
+    """
+    expected = array('d', bytes(8 * goal * goal * (MAX_ROLLS + 1)))
+    reach = array('d', bytes(8 * goal * goal * (MAX_ROLLS + 1)))
+    for score in range(goal):
+        # Rolling dice doesn't depend on the opponent's score.
+        rolls = [(0.0, 0.0)]
+        for num_rolls in range(1, MAX_ROLLS + 1):
+            outcomes = _roll_outcomes(num_rolls, score)
+            rolls.append((sum(new_score * p for new_score, p in outcomes), sum(p for new_score, p in outcomes if new_score >= goal)))
+        for opponent_score in range(goal):
+            index = plan_index(0, score, opponent_score, goal)
+            new_score = sus_points(score + boar_brawl(score, opponent_score))
+            expected[index], reach[index] = new_score, float(new_score >= goal)
+            for num_rolls in range(1, MAX_ROLLS + 1):
+                expected[index + num_rolls], reach[index + num_rolls] = rolls[num_rolls]
+    return expected, reach
+
+
+def expected_score(num_rolls: int, score: int, opponent_score: int, goal: int = GOAL) -> float:
+    """Return the expected score after rolling NUM_ROLLS dice from state
+    (SCORE, OPPONENT_SCORE) under Sus Fuss.
+
+    >>> expected_score(1, 0, 0)  # Sus Fuss turns 4 into 5 and 6 into 7.
+    3.833333333333333
+    """
+    return plan(goal)[0][plan_index(num_rolls, score, opponent_score, goal)]
+
+
+def reach_probability(num_rolls: int, score: int, opponent_score: int, goal: int = GOAL) -> float:
+    """Return the probability that rolling NUM_ROLLS dice from state (SCORE,
+    OPPONENT_SCORE) reaches GOAL under Sus Fuss.
+
+    >>> reach_probability(1, 98, 0), reach_probability(1, 0, 0)
+    (0.8333333333333333, 0.0)
+    """
+    return plan(goal)[1][plan_index(num_rolls, score, opponent_score, goal)]
+
+
+def final_choice(score: int, opponent_score: int, threshold: int = 11, num_rolls: int = 6, goal: int = GOAL) -> int:
+    """Return the number of dice final_strategy rolls from state (SCORE,
+    OPPONENT_SCORE): 0 if Boar Brawl reaches GOAL or gains at least THRESHOLD
+    points, and otherwise the fewest dice below NUM_ROLLS whose expected score
+    reaches GOAL, or NUM_ROLLS if there are none.
+
+    >>> final_choice(0, 0), final_choice(95, 0), final_choice(120, 0)
+    (6, 0, 0)
+    """
+    new_score = sus_points(score + boar_brawl(score, opponent_score))
+    if new_score >= goal or new_score >= score + threshold:
+        return 0
+    # Rolling dice doesn't depend on the opponent's score, which may be past GOAL.
+    return bisect_left(range(num_rolls), goal, 1, key=lambda i: expected_score(i, score, 0, goal))
+
+
+@cache
+def final_plan_strategy(threshold: int = 11, num_rolls: int = 6, goal: int = GOAL) -> Callable[[int, int], int]:
+    """Return final_strategy with THRESHOLD and NUM_ROLLS, compiled into a roll
+    table for GOAL.
+
+    >>> strategy = final_plan_strategy()
+    >>> strategy(0, 0), strategy(95, 0), strategy(120, 0) == final_choice(120, 0)
+    (6, 0, True)
+    """
+    table = [final_choice(score, opponent_score, threshold, num_rolls, goal) for score in range(goal) for opponent_score in range(goal)]
+    return compiled.table_strategy(table, goal, lambda score, opponent_score: final_choice(score, opponent_score, threshold, num_rolls, goal))
@@ -0,0 +1,230 @@
+"""Exact solver for Hog played with fair dice and Sus Fuss.
+
+Every turn adds at least one point to the current player's score, so the game
+state (score, opponent_score) always moves to a state with a larger total.
+Solving the states in order of decreasing total therefore settles every state
+in one sweep, without the repeated passes of value iteration.
+"""
+
+import time
+import tracemalloc
+from collections import OrderedDict
+from collections.abc import Callable
+
+import compiled
+import numpy as np
+from batch import MAX_ROLLS, SIDES, as_roll_table, boar_brawl_batch, make_sus_table, max_turn_points, roll_table
+from ucb import main
+
+from hog import GOAL, always_roll
+
+
+def roll_distributions(sides: int = SIDES) -> np.ndarray:
+    """Return an array whose entry [n, k] is the probability that rolling N
+    fair SIDES-sided dice scores K points, for 1 <= N <= 10. Row 0 is unused.
+
+    >>> dist = roll_distributions()
+    >>> bool(np.allclose(dist[1:].sum(axis=1), 1))
+    True
+    >>> round(float(dist[1, 1]), 4), round(float(dist[2, 12]), 4)
+    (0.1667, 0.0278)
+    >>> round(float(roll_distributions(100)[10, 1]), 4)
+    0.0956
+    """
+    dist = np.zeros((MAX_ROLLS + 1, max_turn_points(sides) + 1))
+    # Convolve the faces other than 1; every other roll scores 1 point.
+    face = np.full(sides + 1, 1 / sides)
+    face[:2] = 0
+    totals = np.ones(1)
+    for n in range(1, MAX_ROLLS + 1):
+        totals = np.convolve(totals, face)
+        dist[n, : len(totals)] = totals
+        dist[n, 1] = 1 - ((sides - 1) / sides) ** n
+    return dist
+
+
+def diagonals(goal: int):
+    """Yield, for each total from the largest down, the arrays of scores and
+    opponent scores of the states (score, opponent_score) with that total."""
+    for total in range(2 * goal - 2, -1, -1):
+        score = np.arange(max(0, total - goal + 1), min(total, goal - 1) + 1)
+        yield score, total - score
+
+
+def turn_values(after: np.ndarray, score: np.ndarray, opponent_score: np.ndarray, rolls: np.ndarray) -> np.ndarray:
+    """Return an array whose entry [i, n] is the expected value of AFTER[i]
+    when rolling N dice from state (SCORE[i], OPPONENT_SCORE[i]), where
+    AFTER[i, k] is a value of scoring K points and ROLLS is roll_distributions.
+
+    Rolling dice doesn't depend on the state, so the values of rolling 1 to 10
+    dice are a single matrix product.
+    """
+    values = np.empty((len(score), MAX_ROLLS + 1), dtype=after.dtype)
+    values[:, 1:] = after @ rolls[1:].T
+    values[:, 0] = after[np.arange(len(score)), boar_brawl_batch(score, opponent_score)]
+    return values
+
+
+def solve(goal: int = GOAL, sides: int = SIDES) -> tuple[np.ndarray, np.ndarray]:
+    """Return (win, table) for Hog with Sus Fuss played to GOAL points with
+    SIDES-sided dice, where win[score, opponent_score] is the probability that
+    the current player wins when both players play optimally, and table is the
+    optimal roll table.
+
+    The probabilities are float32 and the table int8, so a state takes five
+    bytes, and the work for each diagonal of states is done by array operations.
+
+    >>> win, table = solve()
+    >>> round(float(win[0, 0]), 4), int(table[0, 0])
+    (0.5692, 4)
+    >>> win, table = solve(1000, 20)
+    >>> win.dtype, table.shape
+    (dtype('float32'), (1000, 1000))
+    """
+    rolls = roll_distributions(sides).astype(np.float32)
+    points = np.arange(max_turn_points(sides) + 1)
+    sus_table = make_sus_table(goal + len(points))
+    win = np.zeros((goal, goal), dtype=np.float32)
+    table = np.zeros((goal, goal), dtype=np.int8)
+    for score, opponent_score in diagonals(goal):
+        # Chance of winning after scoring each possible number of points.
+        new_score = sus_table[score[:, None] + points]
+        after = np.where(new_score >= goal, 1, 1 - win[opponent_score[:, None], np.minimum(new_score, goal - 1)])
+        values = turn_values(after, score, opponent_score, rolls)
+        table[score, opponent_score] = values.argmax(axis=1)
+        win[score, opponent_score] = values.max(axis=1)
+    return win, table
+
+
+def win_probability(table0: np.ndarray, table1: np.ndarray, goal: int = GOAL, sides: int = SIDES, dtype=np.float32) -> float:
+    """Return the exact probability that Player 0 wins a game with Sus Fuss
+    and SIDES-sided dice when the players use the strategies with roll tables
+    TABLE0 and TABLE1, computed with floats of DTYPE.
+
+    >>> table = roll_table(always_roll(6))
+    >>> p = win_probability(table, table)
+    >>> 0.5 < p < 0.6
+    True
+    """
+    rolls = roll_distributions(sides).astype(dtype)
+    points = np.arange(max_turn_points(sides) + 1)
+    sus_table = make_sus_table(goal + len(points))
+    tables = (as_roll_table(table0, goal), as_roll_table(table1, goal))
+    # win[who][score0, score1] is the chance that Player 0 wins when WHO is
+    # about to take a turn with the given scores.
+    win = np.zeros((2, goal, goal), dtype=dtype)
+    for score0, score1 in diagonals(goal):
+        for who in (0, 1):
+            score, opponent_score = (score0, score1) if who == 0 else (score1, score0)
+            new_score = sus_table[score[:, None] + points]
+            capped = np.minimum(new_score, goal - 1)
+            if who == 0:
+                after = np.where(new_score >= goal, 1, win[1, capped, score1[:, None]])
+            else:
+                after = np.where(new_score >= goal, 0, win[0, score0[:, None], capped])
+            num_rolls = tables[who][score, opponent_score]
+            win[who, score0, score1] = turn_values(after, score, opponent_score, rolls)[np.arange(len(score)), num_rolls]
+    return float(win[0, 0, 0])
+
+
+def exact_win_rate(table: np.ndarray, baseline: np.ndarray | None = None, goal: int = GOAL, sides: int = SIDES, dtype=np.float32) -> float:
+    """Return the exact average win rate of the strategy with roll table TABLE
+    against BASELINE (always_roll(6) by default), as average_win_rate would
+    estimate it, computed with floats of DTYPE.
+    """
+    if baseline is None:
+        baseline = np.full((goal, goal), 6, dtype=np.int8)
+    return (win_probability(table, baseline, goal, sides, dtype) + 1 - win_probability(baseline, table, goal, sides, dtype)) / 2
+
+
+_matchups: OrderedDict[tuple[bytes, bytes, int, int], float] = OrderedDict()  # Win probabilities by roll tables
+MAX_MATCHUPS = 256  # Matchups remembered, the least recently used dropped first.
+
+
+def matchup_win_probability(
+    strategy0: Callable[[int, int], int],
+    strategy1: Callable[[int, int], int],
+    goal: int = GOAL,
+    sides: int = SIDES,
+) -> float:
+    """Return the exact probability that Player 0 wins a game with Sus Fuss
+    when the players use the deterministic strategies STRATEGY0 and STRATEGY1.
+
+    The strategies are compiled into roll tables, and the probability is
+    memoized by the tables, so strategies that make the same choices share it.
+    Only the MAX_MATCHUPS most recently used matchups are remembered.
+
+    >>> p = matchup_win_probability(always_roll(6), always_roll(6))
+    >>> size = len(_matchups)
+    >>> p == matchup_win_probability(lambda score, opponent_score: 6, always_roll(6)), len(_matchups) == size
+    (True, True)
+    """
+    tables = [compiled.compile_strategy(strategy, goal).table for strategy in (strategy0, strategy1)]
+    key = (tables[0].tobytes(), tables[1].tobytes(), goal, sides)
+    if key in _matchups:
+        _matchups.move_to_end(key)
+        return _matchups[key]
+    _matchups[key] = win_probability(*(np.frombuffer(table, dtype=np.int8).reshape(goal, goal) for table in tables), goal, sides)
+    if len(_matchups) > MAX_MATCHUPS:
+        _matchups.popitem(last=False)
+    return _matchups[key]
+
+
+def exact_average_win_rate(
+    strategy: Callable[[int, int], int],
+    baseline: Callable[[int, int], int] = always_roll(6),
+    goal: int = GOAL,
+    sides: int = SIDES,
+) -> float:
+    """Return the exact average win rate of STRATEGY against BASELINE, which
+    average_win_rate estimates by sampling.
+
+    >>> exact_average_win_rate(always_roll(6))
+    0.5
+    """
+    return (matchup_win_probability(strategy, baseline, goal, sides) + 1 - matchup_win_probability(baseline, strategy, goal, sides)) / 2
+
+
+def table_strategy(table: np.ndarray) -> Callable[[int, int], int]:
+    """Return a compiled strategy that rolls TABLE[score, opponent_score] dice.
+
+    >>> strategy = table_strategy(roll_table(always_roll(4)))
+    >>> strategy(10, 20)
+    4
+    """
+    table = np.asarray(table, dtype=np.int8)
+    return compiled.table_strategy(table.ravel().tolist(), len(table))
+
+
+def benchmark(goals=(100, 250, 500, 1000, 2000), sides: int = SIDES) -> None:
+    """Print the time and peak memory that solve takes for each of GOALS."""
+    print(f'{"goal":>6}{"states":>12}{"seconds":>10}{"peak MB":>10}')
+    for goal in goals:
+        tracemalloc.start()
+        start = time.perf_counter()
+        solve(goal, sides)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f'{goal:>6}{goal * goal:>12}{elapsed:>10.2f}{peak / 2**20:>10.1f}')
+
+
+@main
+def run(*args):
+    """Solve Hog and report the optimal strategy's win rate."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Solve Hog exactly')
+    parser.add_argument('--goal', type=int, default=GOAL, help='The score that ends the game')
+    parser.add_argument('--sides', type=int, default=SIDES, help='The number of sides of the dice')
+    parser.add_argument('--benchmark', type=int, nargs='*', metavar='GOAL', help='Time the solver for each GOAL instead')
+    args = parser.parse_args()
+
+    if args.benchmark is not None:
+        benchmark(args.benchmark or (100, 250, 500, 1000, 2000), args.sides)
+        return
+    start = time.perf_counter()
+    win, table = solve(args.goal, args.sides)
+    print(f'Solved {args.goal}x{args.goal} states in {time.perf_counter() - start:.2f}s')
+    print('Optimal win probability going first:', float(win[0, 0]))
+    print('Optimal strategy win rate:', exact_win_rate(table, goal=args.goal, sides=args.sides))
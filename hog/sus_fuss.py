@@ -0,0 +1,94 @@
+"""Precomputed tables for the Sus Fuss rule.
+
+The number of factors and the next prime of every score up to a bound are
+computed once with sieves, so that applying Sus Fuss is a single list lookup.
+The tables grow automatically when a larger score is looked up.
+"""
+
+from array import array
+
+DEFAULT_BOUND = 1024  # Comfortably past GOAL plus the most points in a turn.
+
+_factor_counts = array('H')
+_next_primes = array('I')
+_sus_scores = array('I')
+
+
+def build_tables(bound: int = DEFAULT_BOUND) -> None:
+    """Compute the Sus Fuss tables for every score from 0 to BOUND."""
+    global _factor_counts, _next_primes, _sus_scores
+    factor_counts = array('H', bytes(2 * (bound + 1)))
+    for factor in range(1, bound + 1):
+        for multiple in range(factor, bound + 1, factor):
+            factor_counts[multiple] += 1
+
+    # By Bertrand's postulate there is a prime between n and 2n.
+    limit = 2 * bound + 2
+    is_prime = bytearray([1]) * (limit + 1)
+    is_prime[0] = is_prime[1] = 0
+    for n in range(2, int(limit**0.5) + 1):
+        if is_prime[n]:
+            is_prime[n * n :: n] = bytes(len(range(n * n, limit + 1, n)))
+    next_primes = array('I', bytes(4 * (bound + 1)))
+    following = limit
+    while not is_prime[following]:
+        following -= 1
+    for n in range(limit, -1, -1):
+        if n <= bound:
+            next_primes[n] = following
+        if is_prime[n]:
+            following = n
+
+    _factor_counts, _next_primes = factor_counts, next_primes
+    _sus_scores = array('I', (next_primes[n] if factor_counts[n] in (3, 4) else n for n in range(bound + 1)))
+
+
+def ensure_bound(score: int) -> None:
+    """Grow the tables, if needed, so that they cover SCORE."""
+    if score >= len(_sus_scores):
+        build_tables(max(score, 2 * len(_sus_scores)))
+
+
+def factor_count(n: int) -> int:
+    """Return the number of factors of N, including 1 and N itself.
+
+    >>> factor_count(28), factor_count(97), factor_count(-4)
+    (6, 2, 0)
+    """
+    if n < 0:
+        return 0
+    ensure_bound(n)
+    return _factor_counts[n]
+
+
+def next_prime(n: int) -> int:
+    """Return the smallest prime larger than N.
+
+    >>> next_prime(1), next_prime(24), next_prime(97), next_prime(-5)
+    (2, 29, 101, 2)
+    """
+    if n < 0:
+        return 2
+    ensure_bound(n)
+    return _next_primes[n]
+
+
+def sus_score(score: int) -> int:
+    """Return SCORE after applying the Sus Fuss rule. A negative score has no
+    factors, so it is returned unchanged.
+
+    >>> sus_score(9), sus_score(21), sus_score(22)
+    (11, 23, 23)
+    >>> sus_score(1), sus_score(5), sus_score(12), sus_score(-1)
+    (1, 5, 12, -1)
+    """
+    if score < 0:
+        return score
+    try:
+        return _sus_scores[score]
+    except IndexError:
+        ensure_bound(score)
+        return _sus_scores[score]
+
+
+build_tables()
@@ -1,4 +1,6 @@
-from hog import GOAL_SCORE
+from compiled import is_compiled
+
+from hog import GOAL as GOAL_SCORE
 
 
 def check_strategy_roll(score, opponent_score, num_rolls):
@@ -46,7 +48,15 @@ def check_strategy(strategy, goal=GOAL_SCORE):
     Traceback (most recent call last):
     ...
     AssertionError: strategy(102, 115) returned 100 (invalid number of rolls)
+
+    A compiled strategy is checked by scanning its table instead.
     """
+    if is_compiled(strategy, goal):
+        table = strategy.table
+        if min(table) >= 0 and max(table) <= 10:
+            return
+        for index, num_rolls in enumerate(table):
+            check_strategy_roll(index // goal, index % goal, num_rolls)
     for score in range(goal):
         for opponent_score in range(goal):
             num_rolls = strategy(score, opponent_score)
@@ -1,4 +1,10 @@
-import random
+import hashlib
+import importlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
 
 SUMMARY = 'Start scores = ({s0}, {s1}).\nPlayer {w} rolls {nr} dice and gets outcomes {rv}.\nEnd scores = ({e0}, {e1})'
 
@@ -65,7 +71,8 @@ def safe(commentary):
 
 
 def describe_game(hog, test_number, score0, score1, goal, update):
-    strat_seed0, strat_seed1, dice_seed = run_with_seed(test_number, lambda: [random.randrange(2**32) for _ in range(3)])
+    rng = Random(test_number)
+    strat_seed0, strat_seed1, dice_seed = [rng.randrange(2**32) for _ in range(3)]
     strategy0 = random_strat(strat_seed0)
     strategy1 = random_strat(strat_seed1)
     dice = get_dice(dice_seed)
@@ -86,27 +93,84 @@ def random_strat(seed):
     """
 
     def random_strat(score, opponent_score):
-        # Save the state of the random generator, so strategy calls don't
+        # Each call draws from its own generator, so strategy calls don't
         # impact dice rolls.
         # using this because python's hash function is NOT CONSISTENT ACROSS OSs!!!!!!!!!!!!11!!22!!2!
         conditional_seed = score * 314159265358979 + opponent_score * 27182818284590452353602874713527 + seed * 161803398874989484820
-        return run_with_seed(conditional_seed % (2**32), lambda: random.randrange(0, 11))
+        return Random(conditional_seed % (2**32)).randrange(0, 11)
 
     return random_strat
 
 
-def run_with_seed(seed, fn):
-    state = random.getstate()
-    random.seed(seed)
-    result = fn()
-    random.setstate(state)
-    return result
-
-
 def get_dice(seed):
     def dice():
         nonlocal seed
-        seed, value = run_with_seed(seed, lambda: (random.randrange(0, 2**32), random.randrange(1, 7)))
+        rng = Random(seed)
+        seed, value = rng.randrange(0, 2**32), rng.randrange(1, 7)
         return value
 
     return dice
+
+
+def _describe_games(module_name, test_numbers, score0, score1, goal, update):
+    hog = importlib.import_module(module_name)
+    return [describe_game(hog, test_number, score0, score1, goal, update) for test_number in test_numbers]
+
+
+def local_modules(module):
+    """Return the modules in the directory of MODULE that it imports, directly
+    or through one another, including MODULE itself, in order of name."""
+    directory = os.path.dirname(os.path.abspath(module.__file__))
+    found, stack = {}, [module]
+    while stack:
+        module = stack.pop()
+        if module.__name__ in found:
+            continue
+        found[module.__name__] = module
+        for value in vars(module).values():
+            name = value.__name__ if isinstance(value, type(sys)) else getattr(value, '__module__', None)
+            imported = sys.modules.get(name) if isinstance(name, str) else None
+            path = getattr(imported, '__file__', None)
+            if path and os.path.dirname(os.path.abspath(path)) == directory:
+                stack.append(imported)
+    return [found[name] for name in sorted(found)]
+
+
+def describe_games(hog, test_numbers, score0, score1, goal, update, workers=None, cache_dir='.fuzz_cache', chunk_size=100):
+    """Return a dictionary from each of TEST_NUMBERS to describe_game(hog,
+    test_number, score0, score1, goal, update).
+
+    The games are described by WORKERS processes (one per core by default),
+    CHUNK_SIZE at a time. Descriptions are cached in CACHE_DIR (unless it is
+    None), keyed by the source of HOG and of the modules beside it that it
+    imports (such as dice and sus_fuss), the update function, the starting
+    scores, the goal and the test number.
+    """
+    source = hashlib.sha256()
+    for module in local_modules(hog):
+        with open(module.__file__, 'rb') as f:
+            source.update(module.__name__.encode() + b'\0' + f.read())
+    source_hash = source.hexdigest()[:16]
+    path = cache_dir and os.path.join(cache_dir, f'{source_hash}-{update.__name__}-{score0}-{score1}-{goal}.json')
+    cached = {}
+    if path and os.path.exists(path):
+        with open(path) as f:
+            cached = {int(test_number): summary for test_number, summary in json.load(f).items()}
+    missing = [test_number for test_number in dict.fromkeys(test_numbers) if test_number not in cached]
+    if missing:
+        chunks = [missing[i : i + chunk_size] for i in range(0, len(missing), chunk_size)]
+        n = len(chunks)
+        if workers == 1 or n == 1:
+            results = [_describe_games(hog.__name__, chunk, score0, score1, goal, update) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(workers) as executor:
+                results = list(executor.map(_describe_games, [hog.__name__] * n, chunks, [score0] * n, [score1] * n, [goal] * n, [update] * n))
+        for chunk, summaries in zip(chunks, results):
+            cached.update(zip(chunk, summaries))
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            temporary = path + '.tmp'
+            with open(temporary, 'w') as f:
+                json.dump(cached, f)
+            os.replace(temporary, path)
+    return {test_number: cached[test_number] for test_number in test_numbers}
@@ -0,0 +1,123 @@
+"""Round-robin tournaments between Hog strategies.
+
+Each pairing is played in batches with the batch engine, alternating which
+strategy goes first, and stops as soon as a sequential probability ratio test
+decides which strategy is better. Close pairings use more games and lopsided
+ones far fewer than a fixed sample size would.
+"""
+
+import math
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from statistics import NormalDist
+
+import numpy as np
+from batch import play_batch, roll_table
+from ucb import main
+
+from hog import always_roll, boar_strategy, final_strategy, sus_strategy, sus_update
+
+BATCH_SIZE = 200  # Games per seating between two checks of the test.
+MAX_GAMES = 20000  # Give up on deciding a pairing after this many games.
+
+
+def wilson_interval(wins: int, games: int, z: float = 1.96) -> tuple[float, float]:
+    """Return the Wilson score interval for a win rate of WINS out of GAMES.
+
+    >>> low, high = wilson_interval(60, 100)
+    >>> round(low, 3), round(high, 3)
+    (0.502, 0.691)
+    """
+    rate = wins / games
+    center = (rate + z * z / (2 * games)) / (1 + z * z / games)
+    spread = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / (1 + z * z / games)
+    return center - spread, center + spread
+
+
+def fixed_sample_size(delta: float = 0.02, alpha: float = 0.05, beta: float = 0.05) -> int:
+    """Return the number of games a fixed-size test needs to tell win rate
+    0.5 - DELTA from 0.5 + DELTA with the same error rates as play_match.
+
+    >>> fixed_sample_size()
+    1691
+    """
+    z = NormalDist().inv_cdf
+    return math.ceil(((z(1 - alpha) + z(1 - beta)) * 0.5 / (2 * delta)) ** 2)
+
+
+def play_match(
+    table0: np.ndarray,
+    table1: np.ndarray,
+    seed: np.random.SeedSequence,
+    delta: float = 0.02,
+    alpha: float = 0.05,
+    beta: float = 0.05,
+    max_games: int = MAX_GAMES,
+) -> tuple[int, int]:
+    """Return (wins, games) for the strategy with roll table TABLE0 against
+    TABLE1, playing until Wald's sequential probability ratio test of win rate
+    0.5 - DELTA against 0.5 + DELTA accepts either one (with error rates ALPHA
+    and BETA) or MAX_GAMES games have been played.
+    """
+    low, high = 0.5 - delta, 0.5 + delta
+    upper, lower = math.log((1 - beta) / alpha), math.log(beta / (1 - alpha))
+    win_step, loss_step = math.log(high / low), math.log((1 - high) / (1 - low))
+    wins = games = 0
+    for batch_seed in seed.spawn(max_games // (2 * BATCH_SIZE)):
+        first, second = batch_seed.spawn(2)
+        scores0, scores1 = play_batch(table0, table1, sus_update, BATCH_SIZE, seed=first)
+        wins += int(np.sum(scores0 > scores1))
+        scores0, scores1 = play_batch(table1, table0, sus_update, BATCH_SIZE, seed=second)
+        wins += int(np.sum(scores0 <= scores1))
+        games += 2 * BATCH_SIZE
+        ratio = wins * win_step + (games - wins) * loss_step
+        if ratio >= upper or ratio <= lower:
+            break
+    return wins, games
+
+
+def tournament(
+    strategies: dict[str, Callable[[int, int], int]],
+    seed: int | None = None,
+    workers: int | None = None,
+) -> list[tuple[str, str, int, int]]:
+    """Play every pairing of STRATEGIES, a dictionary from names to strategies,
+    and return a list of (name0, name1, wins of name0, games) results.
+    Pairings are played in parallel by WORKERS processes.
+    """
+    names = list(strategies)
+    tables = {name: roll_table(strategies[name]) for name in names}
+    pairings = list(combinations(names, 2))
+    seeds = np.random.SeedSequence(seed).spawn(len(pairings))
+    with ProcessPoolExecutor(workers or os.cpu_count()) as executor:
+        outcomes = executor.map(play_match, [tables[a] for a, _ in pairings], [tables[b] for _, b in pairings], seeds)
+        return [(a, b, wins, games) for (a, b), (wins, games) in zip(pairings, outcomes)]
+
+
+def print_standings(results: list[tuple[str, str, int, int]]) -> None:
+    """Print each match with its interval and the strategies ranked by their
+    average win rate over their matches."""
+    rates: dict[str, list[float]] = {}
+    print(f'{"match":<40}{"win rate":>10}{"95% interval":>18}{"games":>8}')
+    for a, b, wins, games in results:
+        low, high = wilson_interval(wins, games)
+        print(f'{a + " vs " + b:<40}{wins / games:>10.3f}{f"[{low:.3f}, {high:.3f}]":>18}{games:>8}')
+        rates.setdefault(a, []).append(wins / games)
+        rates.setdefault(b, []).append(1 - wins / games)
+    print()
+    ranking = sorted(rates, key=lambda name: -sum(rates[name]) / len(rates[name]))
+    for rank, name in enumerate(ranking, 1):
+        print(f'{rank:>2}. {name:<20}{sum(rates[name]) / len(rates[name]):.3f}')
+    total = sum(games for *_, games in results)
+    fixed = fixed_sample_size()
+    print(f'\n{total} games played; a fixed-size test would need {fixed * len(results)} ({fixed} per match).')
+
+
+@main
+def run(*args):
+    """Run a tournament between the strategies in hog.py."""
+    strategies = {'boar_strategy': boar_strategy, 'sus_strategy': sus_strategy, 'final_strategy': final_strategy}
+    strategies.update((f'always_roll({n})', always_roll(n)) for n in range(11))
+    print_standings(tournament(strategies))
@@ -0,0 +1,290 @@
+"""Compact game traces.
+
+A TraceRecorder records the turns of many games into array-backed columns
+instead of the list of dictionaries built by hog_gui.trace_play:
+
+    game_turns   int32  offsets of the first turn of each game (one extra)
+    final_scores int16  the final scores of each game, Player 0's first
+    dice_offsets int32  offsets of the first die of each turn (one extra)
+    s0_start     int16  Player 0's score at the start of each turn
+    s1_start     int16  Player 1's score at the start of each turn
+    who          int8   the player taking each turn
+    num_dice     int8   the number of dice chosen for each turn
+    dice         uint8  the outcomes of every die rolled, turn after turn
+
+Recorded games are written to a file in chunks. Each chunk is a header
+followed by its columns, so a trace file can be streamed as games are played
+and memory-mapped to read millions of games without loading them.
+"""
+
+import struct
+from array import array
+from collections.abc import Callable, Iterator
+from typing import NamedTuple
+
+import numpy as np
+from batch import boar_brawl_batch
+from dice import make_test_dice, six_sided
+
+from hog import GOAL
+
+MAGIC = b'HOGTRACE'
+HEADER = struct.Struct('<8sIIIxxxx')  # Magic, numbers of games, turns and dice, padding.
+CHUNK_GAMES = 10000  # Games recorded before a chunk is written.
+
+# The columns of a chunk in file order, with the length of each column given
+# the number of games, turns and dice. Wider columns come first so that every
+# column is aligned.
+COLUMNS = (
+    ('game_turns', 'i', lambda games, turns, dice: games + 1),
+    ('dice_offsets', 'i', lambda games, turns, dice: turns + 1),
+    ('final_scores', 'h', lambda games, turns, dice: 2 * games),
+    ('s0_start', 'h', lambda games, turns, dice: turns),
+    ('s1_start', 'h', lambda games, turns, dice: turns),
+    ('who', 'b', lambda games, turns, dice: turns),
+    ('num_dice', 'b', lambda games, turns, dice: turns),
+    ('dice', 'B', lambda games, turns, dice: dice),
+)
+
+
+class TraceChunk(NamedTuple):
+    """The columns of a chunk of recorded games, as NumPy arrays."""
+
+    game_turns: np.ndarray
+    dice_offsets: np.ndarray
+    final_scores: np.ndarray
+    s0_start: np.ndarray
+    s1_start: np.ndarray
+    who: np.ndarray
+    num_dice: np.ndarray
+    dice: np.ndarray
+
+    @property
+    def num_games(self) -> int:
+        return len(self.game_turns) - 1
+
+
+class TraceRecorder:
+    """Records games played with record into columns, and writes them to the
+    file at PATH (if there is one) every CHUNK_GAMES games.
+
+    >>> from hog import always_roll, play, simple_update
+    >>> recorder = TraceRecorder()
+    >>> recorder.record(play, always_roll(2), always_roll(0), simple_update, goal=10, dice=make_test_dice(3, 4))
+    (14, 1)
+    >>> chunk = recorder.chunk()
+    >>> chunk.num_games, chunk.s0_start.tolist(), chunk.dice.tolist()
+    (1, [0, 7, 7], [3, 4, 3, 4])
+    """
+
+    def __init__(self, path: str | None = None, chunk_games: int = CHUNK_GAMES):
+        self.file = open(path, 'wb') if path else None
+        self.chunk_games = chunk_games
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget the games recorded since the last chunk was written."""
+        self.columns = {name: array(typecode) for name, typecode, _ in COLUMNS}
+        self.columns['game_turns'].append(0)
+        self.columns['dice_offsets'].append(0)
+
+    def record(
+        self,
+        play: Callable[..., tuple[int, int]],
+        strategy0: Callable[[int, int], int],
+        strategy1: Callable[[int, int], int],
+        update: Callable[[int, int, int, Callable[[], int]], int],
+        score0: int = 0,
+        score1: int = 0,
+        dice: Callable[[], int] = six_sided,
+        goal: int = GOAL,
+    ) -> tuple[int, int]:
+        """Play a game with PLAY, like hog_gui.trace_play, and record it.
+        Return the final scores."""
+        s0_start, s1_start, who, num_dice = (self.columns[name] for name in ('s0_start', 's1_start', 'who', 'num_dice'))
+        rolls, dice_offsets = self.columns['dice'], self.columns['dice_offsets']
+        first_turn = len(who)
+
+        def traced_strategy(player, score, opponent_score):
+            # The total score goes up every turn, so a repeated total means
+            # that play asked twice on the same turn.
+            if len(who) > first_turn and s0_start[-1] + s1_start[-1] == score + opponent_score:
+                return num_dice[-1]
+            choice = (strategy0, strategy1)[player](score, opponent_score)
+            s0_start.append(opponent_score if player else score)
+            s1_start.append(score if player else opponent_score)
+            who.append(player)
+            num_dice.append(choice)
+            dice_offsets.append(len(rolls))
+            return choice
+
+        def traced_dice():
+            if len(who) == first_turn:
+                raise RuntimeError('roll_dice called before either strategy function')
+            roll = dice()
+            rolls.append(roll)
+            dice_offsets[-1] = len(rolls)
+            return roll
+
+        try:
+            scores = play(lambda a, b: traced_strategy(0, a, b), lambda a, b: traced_strategy(1, a, b), update, score0, score1, dice=traced_dice, goal=goal)
+        except BaseException:
+            # Drop the turns of the unfinished game.
+            for name in ('s0_start', 's1_start', 'who', 'num_dice'):
+                del self.columns[name][first_turn:]
+            del dice_offsets[first_turn + 1 :]
+            del rolls[dice_offsets[-1] :]
+            raise
+        self.columns['final_scores'].extend(scores)
+        self.columns['game_turns'].append(len(who))
+        if self.file and len(self.columns['game_turns']) > self.chunk_games:
+            self.flush()
+        return scores
+
+    def chunk(self) -> TraceChunk:
+        """Return the games recorded since the last chunk was written."""
+        return TraceChunk(*(np.frombuffer(self.columns[name], dtype=typecode) for name, typecode, _ in COLUMNS))
+
+    def flush(self) -> None:
+        """Write the games recorded since the last chunk to the file."""
+        games, turns, dice = len(self.columns['game_turns']) - 1, len(self.columns['who']), len(self.columns['dice'])
+        if games:
+            self.file.write(HEADER.pack(MAGIC, games, turns, dice))
+            for name, _, _ in COLUMNS:
+                self.file.write(self.columns[name])
+            self.file.write(bytes(-self.file.tell() % 8))
+            self.clear()
+
+    def close(self) -> None:
+        if self.file:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_chunks(path: str) -> Iterator[TraceChunk]:
+    """Yield the chunks of the trace file at PATH. Their columns are views of
+    the memory-mapped file.
+    """
+    data = np.memmap(path, dtype=np.uint8, mode='r')
+    offset = 0
+    while offset < len(data):
+        magic, games, turns, dice = HEADER.unpack_from(data, offset)
+        assert magic == MAGIC, f'{path} is not a trace file'
+        offset += HEADER.size
+        columns = []
+        for _, typecode, length in COLUMNS:
+            size = np.dtype(typecode).itemsize * length(games, turns, dice)
+            columns.append(data[offset : offset + size].view(typecode))
+            offset += size
+        offset += -offset % 8
+        yield TraceChunk(*columns)
+
+
+def turns(chunk: TraceChunk, game: int) -> list[dict]:
+    """Return the turns of GAME in CHUNK as a trace of hog_gui.trace_play."""
+    first, last = chunk.game_turns[game], chunk.game_turns[game + 1]
+    return [
+        {
+            's0_start': int(chunk.s0_start[turn]),
+            's1_start': int(chunk.s1_start[turn]),
+            'who': int(chunk.who[turn]),
+            'num_dice': int(chunk.num_dice[turn]),
+            'dice_values': chunk.dice[chunk.dice_offsets[turn] : chunk.dice_offsets[turn + 1]].tolist(),
+        }
+        for turn in range(first, last)
+    ]
+
+
+def replay(
+    chunk: TraceChunk,
+    game: int,
+    play: Callable[..., tuple[int, int]],
+    update: Callable[[int, int, int, Callable[[], int]], int],
+    goal: int = GOAL,
+) -> tuple[int, int]:
+    """Play GAME of CHUNK again with PLAY and UPDATE, choosing the recorded
+    numbers of dice and rolling the recorded dice, and return the final scores.
+    Raise an AssertionError if they are not the recorded final scores.
+
+    >>> from hog import always_roll, play, sus_update
+    >>> recorder = TraceRecorder()
+    >>> recorder.record(play, always_roll(3), always_roll(5), sus_update, dice=make_test_dice(6, 2, 5, 3))
+    (89, 117)
+    >>> replay(recorder.chunk(), 0, play, sus_update)
+    (89, 117)
+    """
+    game_turns = turns(chunk, game)
+    choices = iter([turn['num_dice'] for turn in game_turns])
+    rolls = [roll for turn in game_turns for roll in turn['dice_values']]
+    start = game_turns[0] if game_turns else {'s0_start': int(chunk.final_scores[2 * game]), 's1_start': int(chunk.final_scores[2 * game + 1])}
+    dice = make_test_dice(*rolls) if rolls else six_sided
+    strategy = lambda score, opponent_score: next(choices)
+    scores = play(strategy, strategy, update, start['s0_start'], start['s1_start'], dice=dice, goal=goal)
+    recorded = (int(chunk.final_scores[2 * game]), int(chunk.final_scores[2 * game + 1]))
+    assert scores == recorded, f'game {game} ended with {scores} instead of the recorded {recorded}'
+    return scores
+
+
+class TraceSummary(NamedTuple):
+    """Statistics of a set of recorded games."""
+
+    games: int
+    turns: int
+    turn_counts: np.ndarray  # turn_counts[n] is the number of games with n turns.
+    sus_fuss_rate: float  # The fraction of turns on which Sus Fuss changed the score.
+
+
+def summarize(chunks: Iterator[TraceChunk] | list[TraceChunk]) -> TraceSummary:
+    """Return a summary of the games in CHUNKS, such as read_chunks(path).
+
+    >>> from hog import always_roll, play, sus_update
+    >>> recorder = TraceRecorder()
+    >>> recorder.record(play, always_roll(1), always_roll(1), sus_update, goal=8, dice=make_test_dice(3, 2))
+    (11, 5)
+    >>> summary = summarize([recorder.chunk()])
+    >>> summary.turn_counts.tolist(), summary.sus_fuss_rate
+    ([0, 0, 0, 0, 0, 1], 0.6)
+    """
+    games = turns_played = sus_fuss_turns = 0
+    turn_counts = np.zeros(1, dtype=np.int64)
+    for chunk in chunks:
+        games += chunk.num_games
+        turns_played += len(chunk.who)
+        counts = np.bincount(np.diff(chunk.game_turns))
+        turn_counts = np.pad(turn_counts, (0, max(0, len(counts) - len(turn_counts))))
+        turn_counts[: len(counts)] += counts
+        sus_fuss_turns += int(np.sum(sus_fuss_triggered(chunk)))
+    return TraceSummary(games, turns_played, turn_counts, sus_fuss_turns / max(turns_played, 1))
+
+
+def sus_fuss_triggered(chunk: TraceChunk) -> np.ndarray:
+    """Return whether Sus Fuss changed the score on each turn of CHUNK: that is,
+    whether the player's score after the turn differs from their score before
+    it plus the points of the turn."""
+    who = chunk.who.astype(bool)
+    start = np.where(who, chunk.s1_start, chunk.s0_start).astype(np.int32)
+    # A player's score after a turn is their score at the start of the next
+    # turn of the game, or their final score.
+    end = np.empty_like(start)
+    end[:-1] = np.where(who[:-1], chunk.s1_start[1:], chunk.s0_start[1:])
+    last = chunk.game_turns[1:] - 1
+    has_turns = chunk.game_turns[1:] > chunk.game_turns[:-1]
+    final = chunk.final_scores.reshape(-1, 2)
+    end[last[has_turns]] = final[has_turns, chunk.who[last[has_turns]]]
+    # Points of each turn: Boar Brawl for 0 dice, 1 if any 1 was rolled, and
+    # the sum of the dice otherwise.
+    dice = chunk.dice.astype(np.int32)
+    cumulative = np.concatenate(([0], np.cumsum(dice)))
+    ones = np.concatenate(([0], np.cumsum(dice == 1)))
+    total = cumulative[chunk.dice_offsets[1:]] - cumulative[chunk.dice_offsets[:-1]]
+    sow_sad = ones[chunk.dice_offsets[1:]] > ones[chunk.dice_offsets[:-1]]
+    opponent = np.where(who, chunk.s0_start, chunk.s1_start).astype(np.int32)
+    points = np.where(chunk.num_dice == 0, boar_brawl_batch(start, opponent), np.where(sow_sad, 1, total))
+    return end != start + points